@@ -0,0 +1,12 @@
+"""Shared Azure credential and bearer-token provider for the samples.
+
+Every chat client built from ``token_provider`` draws tokens from the same in-memory cache,
+so the Azure CLI is shelled out to once per token lifetime instead of once per client.
+"""
+
+from azure.identity import AzureCliCredential, get_bearer_token_provider
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+credential = AzureCliCredential()
+token_provider = get_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE)
@@ -0,0 +1,24 @@
+"""Opt-in JSON-lines output for the samples' conversation transcripts.
+
+Run a sample with ``--json-log`` to print each message as one ``{"speaker": ..., "text": ...}``
+object per line instead of the human-readable transcript. Uses orjson when it is installed.
+"""
+
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the stdlib json encoder
+
+JSON_LOG = "--json-log" in sys.argv[1:]
+
+
+def log_message(speaker: str, text: str) -> None:
+    """Write one conversation message as a JSON line."""
+    record = {"speaker": speaker, "text": text}
+    if orjson is not None:
+        sys.stdout.write(orjson.dumps(record).decode() + "\n")
+    else:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
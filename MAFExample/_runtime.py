@@ -0,0 +1,24 @@
+"""Shared entry-point runner for the samples.
+
+Runs the sample's main() coroutine on a uvloop event loop when uvloop is installed,
+falling back to the default asyncio event loop otherwise.
+"""
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # uvloop is optional; use the default asyncio event loop
+
+T = TypeVar("T")
+
+
+def runner(main: Coroutine[Any, Any, T]) -> T:
+    """Run ``main`` to completion, on uvloop when available."""
+    if uvloop is None:
+        return asyncio.run(main)
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as loop_runner:
+        return loop_runner.run(main)
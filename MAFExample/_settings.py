@@ -0,0 +1,32 @@
+"""Azure OpenAI connection settings for the API-key samples.
+
+``.env`` is loaded and the environment read once at import; callers use ``SETTINGS``.
+"""
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    api_key: str | None
+    api_version: str | None
+    endpoint: str | None
+    deployment_name: str | None
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        env = os.environ
+        return cls(
+            api_key=env.get("AZURE_OPENAI_API_KEY"),
+            api_version=env.get("AZURE_OPENAI_API_VERSION"),
+            endpoint=env.get("AZURE_OPENAI_ENDPOINT"),
+            deployment_name=env.get("AZURE_OPENAI_DEPLOYMENT_NAME"),
+        )
+
+
+SETTINGS = Settings.from_env()
@@ -0,0 +1,37 @@
+"""Shared termination conditions for the handoff samples.
+
+HandoffBuilder calls the termination condition with the whole conversation after every
+turn. Instead of rescanning it each time, the condition returned here counts only the
+messages appended since the previous call.
+"""
+
+from collections.abc import Callable
+
+from agent_framework import ChatMessage
+
+
+def make_message_count_limit(
+    predicate: Callable[[ChatMessage], bool], limit: int
+) -> Callable[[list[ChatMessage]], bool]:
+    """Build a termination condition that is met once `limit` messages match `predicate`.
+
+    If the conversation is shorter than the part already counted, or its last counted
+    message is no longer the one seen before, it was replaced (e.g. a new run), so the
+    count starts over from the beginning.
+    """
+    scanned = 0
+    count = 0
+    last_counted: ChatMessage | None = None
+
+    def condition(conversation: list[ChatMessage]) -> bool:
+        nonlocal scanned, count, last_counted
+        if len(conversation) < scanned or (scanned and conversation[scanned - 1] is not last_counted):
+            scanned = count = 0
+        for i in range(scanned, len(conversation)):
+            if predicate(conversation[i]):
+                count += 1
+        scanned = len(conversation)
+        last_counted = conversation[-1] if conversation else None
+        return count >= limit
+
+    return condition
@@ -1,6 +1,6 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
+import functools
 
 from agent_framework import (
     AgentRunResponse,
@@ -15,6 +15,8 @@ from agent_framework import (
 from agent_framework.azure import AzureOpenAIChatClient
 from azure.identity import AzureCliCredential
 
+from _runtime import runner
+
 """
 Step 4: Using Factories to Define Executors and Agents
 
@@ -57,9 +59,29 @@ async def reverse_text(text: str, ctx: WorkflowContext[str]) -> None:
     await ctx.send_message(result)
 
 
+# One credential for the whole module so its token cache is shared by every client.
+_CRED = AzureCliCredential()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_client() -> AzureOpenAIChatClient:
+    """Return the shared chat client so every factory call reuses one HTTP connection pool."""
+    return AzureOpenAIChatClient(credential=_CRED)
+
+
+def create_upper_case() -> UpperCase:
+    """Factory function to create the UpperCase executor."""
+    return UpperCase(id="upper_case_executor")
+
+
+def create_reverse_text() -> Executor:
+    """Factory function returning the function-based ReverseText executor."""
+    return reverse_text
+
+
 def create_agent() -> ChatAgent:
     """Factory function to create a Writer agent."""
-    return AzureOpenAIChatClient(credential=AzureCliCredential()).create_agent(
+    return _get_chat_client().create_agent(
         instructions=("You decode messages. Try to reconstruct the original message."),
         name="decoder",
     )
@@ -75,8 +97,8 @@ async def main():
     # 5) build() finalizes and returns an immutable Workflow object
     workflow = (
         WorkflowBuilder()
-        .register_executor(lambda: UpperCase(id="upper_case_executor"), name="UpperCase")
-        .register_executor(lambda: reverse_text, name="ReverseText")
+        .register_executor(create_upper_case, name="UpperCase")
+        .register_executor(create_reverse_text, name="ReverseText")
         .register_agent(create_agent, name="DecoderAgent", output_response=True)
         .add_chain(["UpperCase", "ReverseText", "DecoderAgent"])
         .set_start_executor("UpperCase")
@@ -101,4 +123,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
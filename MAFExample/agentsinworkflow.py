@@ -1,13 +1,21 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
-
-from agent_framework import AgentRunEvent, WorkflowBuilder
+import functools
+
+from agent_framework import (
+    AgentRunUpdateEvent,
+    WorkflowBuilder,
+    WorkflowOutputEvent,
+    WorkflowRunState,
+    WorkflowStatusEvent,
+)
 from agent_framework.azure import AzureOpenAIChatClient
 from azure.identity import AzureCliCredential
 
+from _runtime import runner
+
 """
-Step 2: Agents in a Workflow non-streaming
+Step 2: Agents in a Workflow streaming
 
 This sample uses two custom executors. A Writer agent creates or edits content,
 then hands the conversation to a Reviewer agent which evaluates and finalizes the result.
@@ -24,10 +32,20 @@ Prerequisites:
 """
 
 
+# One credential for the whole module so its token cache is shared by every client.
+_CRED = AzureCliCredential()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_client() -> AzureOpenAIChatClient:
+    """Return the shared chat client so repeated workflow builds reuse one HTTP connection pool."""
+    return AzureOpenAIChatClient(credential=_CRED)
+
+
 async def main():
     """Build and run a simple two node agent workflow: Writer then Reviewer."""
-    # Create the Azure chat client. AzureCliCredential uses your current az login.
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+    # Get the shared Azure chat client. AzureCliCredential uses your current az login.
+    chat_client = _get_chat_client()
     writer_agent = chat_client.create_agent(
         instructions=(
             "You are an excellent content writer. You create new content and edit contents based on the feedback."
@@ -49,16 +67,29 @@ async def main():
     workflow = WorkflowBuilder().set_start_executor(writer_agent).add_edge(writer_agent, reviewer_agent).build()
 
     # Run the workflow with the user's initial message.
-    # For foundational clarity, use run (non streaming) and print the terminal event.
-    events = await workflow.run("Create a slogan for a new electric SUV that is affordable and fun to drive.")
-    # Print agent run events and final outputs
-    for event in events:
-        if isinstance(event, AgentRunEvent):
-            print(f"{event.executor_id}: {event.data}")
-
-    print(f"{'=' * 60}\nWorkflow Outputs: {events.get_outputs()}")
-    # Summarize the final run state (e.g., COMPLETED)
-    print("Final state:", events.get_final_state())
+    # Stream events and handle each one as it arrives instead of buffering the whole run.
+    outputs: list[str] = []
+    final_state: WorkflowRunState | None = None
+    last_executor_id: str | None = None
+    async for event in workflow.run_stream(
+        "Create a slogan for a new electric SUV that is affordable and fun to drive."
+    ):
+        if isinstance(event, AgentRunUpdateEvent):
+            # Print agent updates inline, starting a new line whenever the speaker changes
+            if event.executor_id != last_executor_id:
+                if last_executor_id is not None:
+                    print()
+                print(f"{event.executor_id}:", end=" ", flush=True)
+                last_executor_id = event.executor_id
+            print(event.data, end="", flush=True)
+        elif isinstance(event, WorkflowOutputEvent):
+            outputs.append(event.data)
+        elif isinstance(event, WorkflowStatusEvent):
+            final_state = event.state
+
+    print(f"\n{'=' * 60}\nWorkflow Outputs: {outputs}")
+    # Summarize the final run state (e.g., IDLE)
+    print("Final state:", final_state)
 
     """
     Sample Output:
@@ -83,4 +114,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
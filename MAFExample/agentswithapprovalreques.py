@@ -1,25 +1,49 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import asyncio
+import functools
 import json
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Annotated, Never
 
 from agent_framework import (
     AgentExecutorResponse,
     ChatAgent,
-    ChatMessage,
     Executor,
     FunctionApprovalRequestContent,
     FunctionApprovalResponseContent,
+    RequestInfoEvent,
+    Workflow,
     WorkflowBuilder,
     WorkflowContext,
+    WorkflowOutputEvent,
     ai_function,
     executor,
     handler,
 )
 from agent_framework.openai import OpenAIChatClient
 
+from _runtime import runner
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the stdlib json encoder
+
+# Set QUIET=1 to skip printing approval request details.
+QUIET = os.environ.get("QUIET", "") not in ("", "0")
+
+# Seconds send_email waits to simulate delivery. Set DEMO_DELAY=1 for the original demo pacing.
+_DELAY = float(os.environ.get("DEMO_DELAY", "0"))
+
+# Senders whose emails get the special-attention note, shared by every workflow build.
+_SPECIAL_EMAILS = frozenset(map(sys.intern, ("mike@contoso.com",)))
+
 """
 Sample: Agents in a workflow with AI functions requiring approval
 
@@ -53,6 +77,13 @@ Prerequisites:
 """
 
 
+def _dumps(obj: object) -> str:
+    """Serialize approval request details compactly, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
 @ai_function
 def get_current_date() -> str:
     """Get the current date in YYYY-MM-DD format."""
@@ -60,11 +91,10 @@ def get_current_date() -> str:
     return "2025-11-07"
 
 
-@ai_function
-def get_team_members_email_addresses() -> list[dict[str, str]]:
-    """Get the email addresses of team members."""
-    # In a real implementation, this might query a database or directory service.
-    return [
+# Directory data returned by the tools below, built once at import time.
+_TEAM_MEMBERS: tuple[Mapping[str, str], ...] = tuple(
+    MappingProxyType(member)
+    for member in (
         {
             "name": "Alice",
             "email": "alice@contoso.com",
@@ -89,29 +119,37 @@ def get_team_members_email_addresses() -> list[dict[str, str]]:
             "position": "Principal Software Engineer Manager",
             "manager": "VP of Engineering",
         },
-    ]
-
+    )
+)
 
-@ai_function
-def get_my_information() -> dict[str, str]:
-    """Get my personal information."""
-    return {
+_MY_INFORMATION: Mapping[str, str] = MappingProxyType(
+    {
         "name": "John Doe",
         "email": "john@contoso.com",
         "position": "Software Engineer Manager",
         "manager": "Mike",
     }
+)
 
 
-@ai_function(approval_mode="always_require")
-async def read_historical_email_data(
-    email_address: Annotated[str, "The email address to read historical data from"],
-    start_date: Annotated[str, "The start date in YYYY-MM-DD format"],
-    end_date: Annotated[str, "The end date in YYYY-MM-DD format"],
-) -> list[dict[str, str]]:
-    """Read historical email data for a given email address and date range."""
-    historical_data = {
-        "alice@contoso.com": [
+@ai_function
+def get_team_members_email_addresses() -> list[dict[str, str]]:
+    """Get the email addresses of team members."""
+    # In a real implementation, this might query a database or directory service.
+    # Return plain dicts so the result serializes like any other tool output.
+    return [dict(member) for member in _TEAM_MEMBERS]
+
+
+@ai_function
+def get_my_information() -> dict[str, str]:
+    """Get my personal information."""
+    return dict(_MY_INFORMATION)
+
+
+# Historical emails per sender, built once at import time.
+_HISTORICAL_DATA: Mapping[str, tuple[dict[str, str], ...]] = MappingProxyType(
+    {
+        "alice@contoso.com": (
             {
                 "from": "alice@contoso.com",
                 "to": "john@contoso.com",
@@ -126,8 +164,8 @@ async def read_historical_email_data(
                 "subject": "Code Freeze",
                 "body": "We are entering code freeze starting tomorrow.",
             },
-        ],
-        "bob@contoso.com": [
+        ),
+        "bob@contoso.com": (
             {
                 "from": "bob@contoso.com",
                 "to": "john@contoso.com",
@@ -142,8 +180,8 @@ async def read_historical_email_data(
                 "subject": "Requirements Update",
                 "body": "The requirements for the new feature have been updated. Please review them.",
             },
-        ],
-        "charlie@contoso.com": [
+        ),
+        "charlie@contoso.com": (
             {
                 "from": "charlie@contoso.com",
                 "to": "john@contoso.com",
@@ -158,11 +196,35 @@ async def read_historical_email_data(
                 "subject": "Code Review",
                 "body": "Please review my latest code changes.",
             },
-        ],
+        ),
     }
+)
+
+
+def _index_by_date(
+    emails: tuple[dict[str, str], ...],
+) -> tuple[tuple[str, ...], tuple[dict[str, str], ...]]:
+    """Sort emails by date and return (dates, emails) so date ranges can be found with bisect."""
+    ordered = tuple(sorted(emails, key=lambda email: email["date"]))
+    return tuple(email["date"] for email in ordered), ordered
 
-    emails = historical_data.get(email_address, [])
-    return [email for email in emails if start_date <= email["date"] <= end_date]
+
+_HISTORICAL_INDEX = MappingProxyType(
+    {address: _index_by_date(emails) for address, emails in _HISTORICAL_DATA.items()}
+)
+
+
+@ai_function(approval_mode="always_require")
+async def read_historical_email_data(
+    email_address: Annotated[str, "The email address to read historical data from"],
+    start_date: Annotated[str, "The start date in YYYY-MM-DD format"],
+    end_date: Annotated[str, "The end date in YYYY-MM-DD format"],
+) -> list[dict[str, str]]:
+    """Read historical email data for a given email address and date range."""
+    if email_address not in _HISTORICAL_INDEX:
+        return []
+    dates, emails = _HISTORICAL_INDEX[email_address]
+    return list(emails[bisect_left(dates, start_date) : bisect_right(dates, end_date)])
 
 
 @ai_function(approval_mode="always_require")
@@ -172,11 +234,12 @@ async def send_email(
     body: Annotated[str, "The email body"],
 ) -> str:
     """Send an email."""
-    await asyncio.sleep(1)  # Simulate sending email
+    if _DELAY:
+        await asyncio.sleep(_DELAY)  # Simulate sending email
     return "Email successfully sent."
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Email:
     sender: str
     subject: str
@@ -184,20 +247,20 @@ class Email:
 
 
 class EmailPreprocessor(Executor):
-    def __init__(self, special_email_addresses: set[str]) -> None:
+    def __init__(self, special_email_addresses: frozenset[str]) -> None:
         super().__init__(id="email_preprocessor")
-        self.special_email_addresses = special_email_addresses
+        self._special = special_email_addresses
+        self._note_prefix = (
+            "Pay special attention to this sender. This email is very important. "
+            "Gather relevant information from all previous emails within my team before responding.\n\n"
+        )
 
     @handler
     async def preprocess(self, email: Email, ctx: WorkflowContext[str]) -> None:
         """Preprocess the incoming email."""
-        message = str(email)
-        if email.sender in self.special_email_addresses:
-            note = (
-                "Pay special attention to this sender. This email is very important. "
-                "Gather relevant information from all previous emails within my team before responding."
-            )
-            message = f"{note}\n\n{message}"
+        message = f"From: {email.sender}\nSubject: {email.subject}\n\n{email.body}"
+        if email.sender in self._special:
+            message = self._note_prefix + message
 
         await ctx.send_message(message)
 
@@ -211,38 +274,74 @@ async def conclude_workflow(
     await ctx.yield_output(email_response.agent_run_response.text)
 
 
+# Tools available to the Email Writer agent, defined once for every factory call.
+_EMAIL_WRITER_TOOLS = (
+    read_historical_email_data,
+    send_email,
+    get_current_date,
+    get_team_members_email_addresses,
+    get_my_information,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_client() -> OpenAIChatClient:
+    """Return the shared chat client so every factory call reuses one HTTP connection pool."""
+    return OpenAIChatClient()
+
+
 def create_email_writer_agent() -> ChatAgent:
     """Create the Email Writer agent with tools that require approval."""
-    return OpenAIChatClient().create_agent(
+    return _get_chat_client().create_agent(
         name="Email Writer",
         instructions=("You are an excellent email assistant. You respond to incoming emails."),
         # tools with `approval_mode="always_require"` will trigger approval requests
-        tools=[
-            read_historical_email_data,
-            send_email,
-            get_current_date,
-            get_team_members_email_addresses,
-            get_my_information,
-        ],
+        tools=list(_EMAIL_WRITER_TOOLS),
     )
 
 
-async def main() -> None:
-    # Build the workflow
-    workflow = (
+def create_email_preprocessor() -> EmailPreprocessor:
+    """Create the EmailPreprocessor executor."""
+    return EmailPreprocessor(special_email_addresses=_SPECIAL_EMAILS)
+
+
+def create_conclude_workflow() -> Executor:
+    """Return the function-based conclude_workflow executor."""
+    return conclude_workflow
+
+
+async def _approve(request_info_event: RequestInfoEvent) -> tuple[str, FunctionApprovalResponseContent]:
+    """Decide a single approval request and return it keyed by request id."""
+    # For demo purposes, we automatically approve the request. A real handler might await
+    # an external approval service here.
+    # The expected response type of the request is `FunctionApprovalResponseContent`,
+    # which can be created via `create_response` method on the request content
+    return request_info_event.request_id, request_info_event.data.create_response(approved=True)
+
+
+def _build_workflow() -> Workflow:
+    """
+    Build a fresh email workflow.
+
+    Build one per email: the agent executor keeps its conversation thread across runs,
+    so a reused Workflow would carry the previous email's conversation into the next.
+    """
+    return (
         WorkflowBuilder()
         .register_agent(create_email_writer_agent, name="email_writer")
-        .register_executor(
-            lambda: EmailPreprocessor(special_email_addresses={"mike@contoso.com"}),
-            name="email_preprocessor",
-        )
-        .register_executor(lambda: conclude_workflow, name="conclude_workflow")
+        .register_executor(create_email_preprocessor, name="email_preprocessor")
+        .register_executor(create_conclude_workflow, name="conclude_workflow")
         .set_start_executor("email_preprocessor")
         .add_edge("email_preprocessor", "email_writer")
         .add_edge("email_writer", "conclude_workflow")
         .build()
     )
 
+
+async def main() -> None:
+    # Build the workflow
+    workflow = _build_workflow()
+
     # Simulate an incoming email
     incoming_email = Email(
         sender="mike@contoso.com",
@@ -250,40 +349,40 @@ async def main() -> None:
         body="Please provide your team's status update on the project since last week.",
     )
 
-    responses: dict[str, FunctionApprovalResponseContent] = {}
-    output: list[ChatMessage] | None = None
-    while True:
-        if responses:
-            events = await workflow.send_responses(responses)
-            responses.clear()
-        else:
-            events = await workflow.run(incoming_email)
-
-        request_info_events = events.get_request_info_events()
-        for request_info_event in request_info_events:
-            # We should only expect FunctionApprovalRequestContent in this sample
-            if not isinstance(request_info_event.data, FunctionApprovalRequestContent):
-                raise ValueError(f"Unexpected request info content type: {type(request_info_event.data)}")
-
-            # Pretty print the function call details
-            arguments = json.dumps(request_info_event.data.function_call.parse_arguments(), indent=2)
-            print(
-                f"Received approval request for function: {request_info_event.data.function_call.name} "
-                f"with args:\n{arguments}"
+    # Consume events as they arrive. Approval requests are collected while the stream runs;
+    # once the workflow goes idle they are answered in one batch, which resumes the stream.
+    output: str | None = None
+    stream = workflow.run_stream(incoming_email)
+    while stream is not None:
+        request_info_events: list[RequestInfoEvent] = []
+        async for event in stream:
+            if isinstance(event, RequestInfoEvent):
+                # We should only expect FunctionApprovalRequestContent in this sample
+                if not isinstance(event.data, FunctionApprovalRequestContent):
+                    raise ValueError(f"Unexpected request info content type: {type(event.data)}")
+                request_info_events.append(event)
+            elif isinstance(event, WorkflowOutputEvent):
+                # Outputs can only be produced by the conclude_workflow_executor in this sample
+                output = event.data
+
+        stream = None
+        if request_info_events:
+            if not QUIET:
+                # Print the function call details of the whole batch at once
+                function_calls = _dumps(
+                    [
+                        {"name": ev.data.function_call.name, "args": ev.data.function_call.parse_arguments()}
+                        for ev in request_info_events
+                    ]
+                )
+                print(f"Received approval requests for functions: {function_calls}")
+                print("Performing automatic approval for demo purposes...")
+
+            # Approval requests in a batch are independent, so decide them concurrently
+            responses: dict[str, FunctionApprovalResponseContent] = dict(
+                await asyncio.gather(*(_approve(ev) for ev in request_info_events))
             )
-
-            # For demo purposes, we automatically approve the request
-            # The expected response type of the request is `FunctionApprovalResponseContent`,
-            # which can be created via `create_response` method on the request content
-            print("Performing automatic approval for demo purposes...")
-            responses[request_info_event.request_id] = request_info_event.data.create_response(approved=True)
-
-        # Once we get an output event, we can conclude the workflow
-        # Outputs can only be produced by the conclude_workflow_executor in this sample
-        if outputs := events.get_outputs():
-            # We expect only one output from the conclude_workflow_executor
-            output = outputs[0]
-            break
+            stream = workflow.send_responses_streaming(responses)
 
     if not output:
         raise RuntimeError("Workflow did not produce any output event.")
@@ -293,50 +392,9 @@ async def main() -> None:
 
     """
     Sample Output:
-    Received approval request for function: read_historical_email_data with args:
-    {
-        "email_address": "alice@contoso.com",
-        "start_date": "2025-10-31",
-        "end_date": "2025-11-07"
-    }
+    Received approval requests for functions: [{"name":"read_historical_email_data","args":{"email_address":"alice@contoso.com","start_date":"2025-10-31","end_date":"2025-11-07"}},{"name":"read_historical_email_data","args":{"email_address":"bob@contoso.com","start_date":"2025-10-31","end_date":"2025-11-07"}},{"name":"read_historical_email_data","args":{"email_address":"charlie@contoso.com","start_date":"2025-10-31","end_date":"2025-11-07"}}]
     Performing automatic approval for demo purposes...
-    Received approval request for function: read_historical_email_data with args:
-    {
-        "email_address": "bob@contoso.com",
-        "start_date": "2025-10-31",
-        "end_date": "2025-11-07"
-    }
-    Performing automatic approval for demo purposes...
-    Received approval request for function: read_historical_email_data with args:
-    {
-        "email_address": "charlie@contoso.com",
-        "start_date": "2025-10-31",
-        "end_date": "2025-11-07"
-    }
-    Performing automatic approval for demo purposes...
-    Received approval request for function: send_email with args:
-    {
-        "to": "mike@contoso.com",
-        "subject": "Team's Status Update on the Project",
-        "body": "
-        Hi Mike,
-
-        Here's the status update from our team:
-        - **Bug Bash and Code Freeze:**
-            - We recently completed a bug bash, during which several issues were identified. Alice and Charlie are working on fixing these critical bugs, and we anticipate resolving them by the end of this week.
-            - We have entered a code freeze as of November 4, 2025.
-
-        - **Requirements Update:**
-            - Bob has updated the requirements for a new feature, and all team members are reviewing these changes to ensure alignment.
-
-        - **Ongoing Reviews:**
-            - Charlie has submitted his latest code changes for review to ensure they meet our quality standards.
-
-        Please let me know if you need more detailed information or have any questions.
-
-        Best regards,
-        John"
-    }
+    Received approval requests for functions: [{"name":"send_email","args":{"to":"mike@contoso.com","subject":"Team's Status Update on the Project","body":"Hi Mike,\n\nHere's the status update from our team: ..."}}]
     Performing automatic approval for demo purposes...
     Final email response conversation:
     I've sent the status update to Mike with the relevant information from the team. Let me know if there's anything else you need
@@ -344,4 +402,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
@@ -1,8 +1,9 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
-from collections.abc import AsyncIterable
-from typing import Annotated, cast
+import sys
+from collections import deque
+from collections.abc import AsyncIterable, Callable
+from typing import Annotated, Any, cast
 
 from agent_framework import (
     ChatAgent,
@@ -18,7 +19,9 @@ from agent_framework import (
     ai_function,
 )
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
+
+from _auth import token_provider
+from _runtime import runner
 
 """Sample: Simple handoff workflow with single-tier triage-to-specialist routing.
 
@@ -66,6 +69,15 @@ def process_return(order_number: Annotated[str, "Order number to process return
     return f"Return initiated successfully for order {order_number}. You will receive return instructions via email."
 
 
+_TRIAGE_INSTRUCTIONS = (
+    "You are frontline support triage. Route customer issues to the appropriate specialist agents "
+    "based on the problem described."
+)
+_REFUND_INSTRUCTIONS = "You process refund requests."
+_ORDER_INSTRUCTIONS = "You handle order and shipping inquiries."
+_RETURN_INSTRUCTIONS = "You manage product return requests."
+
+
 def create_agents(chat_client: AzureOpenAIChatClient) -> tuple[ChatAgent, ChatAgent, ChatAgent, ChatAgent]:
     """Create and configure the triage and specialist agents.
 
@@ -83,16 +95,13 @@ def create_agents(chat_client: AzureOpenAIChatClient) -> tuple[ChatAgent, ChatAg
     """
     # Triage agent: Acts as the frontline dispatcher
     triage_agent = chat_client.create_agent(
-        instructions=(
-            "You are frontline support triage. Route customer issues to the appropriate specialist agents "
-            "based on the problem described."
-        ),
+        instructions=_TRIAGE_INSTRUCTIONS,
         name="triage_agent",
     )
 
     # Refund specialist: Handles refund requests
     refund_agent = chat_client.create_agent(
-        instructions="You process refund requests.",
+        instructions=_REFUND_INSTRUCTIONS,
         name="refund_agent",
         # In a real application, an agent can have multiple tools; here we keep it simple
         tools=[process_refund],
@@ -100,7 +109,7 @@ def create_agents(chat_client: AzureOpenAIChatClient) -> tuple[ChatAgent, ChatAg
 
     # Order/shipping specialist: Resolves delivery issues
     order_agent = chat_client.create_agent(
-        instructions="You handle order and shipping inquiries.",
+        instructions=_ORDER_INSTRUCTIONS,
         name="order_agent",
         # In a real application, an agent can have multiple tools; here we keep it simple
         tools=[check_order_status],
@@ -108,7 +117,7 @@ def create_agents(chat_client: AzureOpenAIChatClient) -> tuple[ChatAgent, ChatAg
 
     # Return specialist: Handles return requests
     return_agent = chat_client.create_agent(
-        instructions="You manage product return requests.",
+        instructions=_RETURN_INSTRUCTIONS,
         name="return_agent",
         # In a real application, an agent can have multiple tools; here we keep it simple
         tools=[process_return],
@@ -117,65 +126,83 @@ def create_agents(chat_client: AzureOpenAIChatClient) -> tuple[ChatAgent, ChatAg
     return triage_agent, refund_agent, order_agent, return_agent
 
 
-async def _drain(stream: AsyncIterable[WorkflowEvent]) -> list[WorkflowEvent]:
-    """Collect all events from an async stream into a list.
+def _on_status(event: WorkflowStatusEvent, requests: list[RequestInfoEvent]) -> None:
+    """WorkflowStatusEvent: Indicates workflow state changes."""
+    if event.state in {WorkflowRunState.IDLE, WorkflowRunState.IDLE_WITH_PENDING_REQUESTS}:
+        print(f"\n[Workflow Status] {event.state.name}")
 
-    This helper drains the workflow's event stream so we can process events
-    synchronously after each workflow step completes.
 
-    Args:
-        stream: Async iterable of WorkflowEvent
+def _on_output(event: WorkflowOutputEvent, requests: list[RequestInfoEvent]) -> None:
+    """WorkflowOutputEvent: Contains the final conversation when workflow terminates."""
+    conversation = cast(list[ChatMessage], event.data)
+    if isinstance(conversation, list):
+        lines = ["\n=== Final Conversation Snapshot ==="]
+        lines += (f"- {m.author_name or m.role.value}: {m.text}" for m in conversation)
+        lines.append("===================================")
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _on_request(event: RequestInfoEvent, requests: list[RequestInfoEvent]) -> None:
+    """RequestInfoEvent: Workflow is requesting user input."""
+    if isinstance(event.data, HandoffUserInputRequest):
+        _print_agent_responses_since_last_user_message(event.data)
+    requests.append(event)
 
-    Returns:
-        List of all events from the stream
-    """
-    return [event async for event in stream]
 
+# Event type -> handler. Events of any other type pass through untouched.
+_EVENT_HANDLERS: dict[type[WorkflowEvent], Callable[[Any, list[RequestInfoEvent]], None]] = {
+    WorkflowStatusEvent: _on_status,
+    WorkflowOutputEvent: _on_output,
+    RequestInfoEvent: _on_request,
+}
 
-def _handle_events(events: list[WorkflowEvent]) -> list[RequestInfoEvent]:
-    """Process workflow events and extract any pending user input requests.
 
-    This function inspects each event type and:
+async def _consume(stream: AsyncIterable[WorkflowEvent]) -> list[RequestInfoEvent]:
+    """Process workflow events as they arrive and collect any pending user input requests.
+
+    Each event is dispatched by its type through _EVENT_HANDLERS, which:
     - Prints workflow status changes (IDLE, IDLE_WITH_PENDING_REQUESTS, etc.)
     - Displays final conversation snapshots when workflow completes
     - Prints user input request prompts
     - Collects all RequestInfoEvent instances for response handling
 
+    Only the RequestInfoEvents are kept; every other event is handled and released
+    immediately, so output appears while the workflow is still running.
+
     Args:
-        events: List of WorkflowEvent to process
+        stream: Async iterable of WorkflowEvent
 
     Returns:
         List of RequestInfoEvent representing pending user input requests
     """
     requests: list[RequestInfoEvent] = []
 
-    for event in events:
-        # WorkflowStatusEvent: Indicates workflow state changes
-        if isinstance(event, WorkflowStatusEvent) and event.state in {
-            WorkflowRunState.IDLE,
-            WorkflowRunState.IDLE_WITH_PENDING_REQUESTS,
-        }:
-            print(f"\n[Workflow Status] {event.state.name}")
-
-        # WorkflowOutputEvent: Contains the final conversation when workflow terminates
-        elif isinstance(event, WorkflowOutputEvent):
-            conversation = cast(list[ChatMessage], event.data)
-            if isinstance(conversation, list):
-                print("\n=== Final Conversation Snapshot ===")
-                for message in conversation:
-                    speaker = message.author_name or message.role.value
-                    print(f"- {speaker}: {message.text}")
-                print("===================================")
-
-        # RequestInfoEvent: Workflow is requesting user input
-        elif isinstance(event, RequestInfoEvent):
-            if isinstance(event.data, HandoffUserInputRequest):
-                _print_agent_responses_since_last_user_message(event.data)
-            requests.append(event)
+    async for event in stream:
+        handler = _EVENT_HANDLERS.get(type(event))
+        if handler is not None:
+            handler(event, requests)
 
     return requests
 
 
+_CLOSING_WINDOW = 64
+
+
+def _triage_closed_conversation(conversation: list[ChatMessage]) -> bool:
+    """Return True when the last message is a closing "welcome" from the triage agent.
+
+    Closing phrases ("You're welcome! ...", "... you're welcome.") sit at the start or end of
+    the reply, so only bounded head and tail windows are lowercased instead of the whole text.
+    """
+    if not conversation:
+        return False
+    last = conversation[-1]
+    if last.author_name != "triage_agent":
+        return False
+    text = last.text
+    return "welcome" in text[:_CLOSING_WINDOW].lower() or "welcome" in text[-_CLOSING_WINDOW:].lower()
+
+
 def _print_agent_responses_since_last_user_message(request: HandoffUserInputRequest) -> None:
     """Display agent responses since the last user message in a handoff request.
 
@@ -188,18 +215,13 @@ def _print_agent_responses_since_last_user_message(request: HandoffUserInputRequ
     if not request.conversation:
         raise RuntimeError("HandoffUserInputRequest missing conversation history.")
 
-    # Reverse iterate to collect agent responses since last user message
-    agent_responses: list[ChatMessage] = []
-    for message in request.conversation[::-1]:
-        if message.role == Role.USER:
-            break
-        agent_responses.append(message)
+    # Scan backwards (without copying the list) for the last user message
+    conversation = request.conversation
+    start = next((i + 1 for i in range(len(conversation) - 1, -1, -1) if conversation[i].role == Role.USER), 0)
 
     # Print agent responses in original order
-    agent_responses.reverse()
-    for message in agent_responses:
-        speaker = message.author_name or message.role.value
-        print(f"- {speaker}: {message.text}")
+    rows = [(m.author_name or m.role.value, m.text) for m in conversation[start:]]
+    sys.stdout.write("".join(f"- {speaker}: {text}\n" for speaker, text in rows))
 
 
 async def main() -> None:
@@ -216,7 +238,7 @@ async def main() -> None:
     replace the scripted_responses with actual user input collection.
     """
     # Initialize the Azure OpenAI chat client
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+    chat_client = AzureOpenAIChatClient(ad_token_provider=token_provider)
 
     # Create all agents: triage + specialists
     triage, refund, order, support = create_agents(chat_client)
@@ -239,9 +261,7 @@ async def main() -> None:
             # Custom termination: Check if the triage agent has provided a closing message.
             # This looks for the last message being from triage_agent and containing "welcome",
             # which indicates the conversation has concluded naturally.
-            lambda conversation: len(conversation) > 0
-            and conversation[-1].author_name == "triage_agent"
-            and "welcome" in conversation[-1].text.lower()
+            _triage_closed_conversation
         )
         .build()
     )
@@ -250,37 +270,42 @@ async def main() -> None:
     # In a console application, replace this with:
     #   user_input = input("Your response: ")
     # or integrate with a UI/chat interface
-    scripted_responses = [
-        "My order 1234 arrived damaged and the packaging was destroyed. I'd like to return it.",
-        "Thanks for resolving this.",
-    ]
+    scripted_responses = deque(
+        [
+            "My order 1234 arrived damaged and the packaging was destroyed. I'd like to return it.",
+            "Thanks for resolving this.",
+        ]
+    )
 
     # Start the workflow with the initial user message
     # run_stream() returns an async iterator of WorkflowEvent
     print("[Starting workflow with initial user message...]\n")
     initial_message = "Hello, I need assistance with my recent purchase."
     print(f"- User: {initial_message}")
-    events = await _drain(workflow.run_stream(initial_message))
-    pending_requests = _handle_events(events)
+    pending_requests = await _consume(workflow.run_stream(initial_message))
 
     # Process the request/response cycle
     # The workflow will continue requesting input until:
     # 1. The termination condition is met (4 user messages in this case), OR
     # 2. We run out of scripted responses
+    # The responses dict is reused across turns; it is only refilled once the previous
+    # send_responses_streaming() stream has been fully consumed.
+    responses: dict[str, str] = {}
     while pending_requests and scripted_responses:
         # Get the next scripted response
-        user_response = scripted_responses.pop(0)
+        user_response = scripted_responses.popleft()
         print(f"\n- User: {user_response}")
 
         # Send response(s) to all pending requests
         # In this demo, there's typically one request per cycle, but the API supports multiple
-        responses = {req.request_id: user_response for req in pending_requests}
+        responses.clear()
+        for req in pending_requests:
+            responses[req.request_id] = user_response
 
-        # Send responses and get new events
+        # Send responses and process new events
         # We use send_responses_streaming() to get events as they occur, allowing us to
         # display agent responses in real-time and handle new requests as they arrive
-        events = await _drain(workflow.send_responses_streaming(responses))
-        pending_requests = _handle_events(events)
+        pending_requests = await _consume(workflow.send_responses_streaming(responses))
 
     """
     Sample Output:
@@ -315,4 +340,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
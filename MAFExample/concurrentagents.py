@@ -1,11 +1,18 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
 from typing import Any
 
 from agent_framework import ChatMessage, ConcurrentBuilder
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
+
+from _auth import token_provider
+from _runtime import runner
 
 """
 Sample: Concurrent fan-out/fan-in (agent-only API) with default aggregator
@@ -23,52 +30,126 @@ Demonstrates:
 Prerequisites:
 - Azure OpenAI access configured for AzureOpenAIChatClient (use az login + env vars)
 - Familiarity with Workflow events (AgentRunEvent, WorkflowOutputEvent)
+
+Optional response cache:
+- Pass --cache (or set MAF_CONVERSATION_CACHE=1) to cache aggregated conversations on disk
+  (~/.cache/maf/concurrent.sqlite). This is an exact-match cache, not a semantic one: the key is
+  the model deployment, each participant's name and instructions, and the prompt normalized for
+  case and whitespace. A cached reply is announced before it is printed.
 """
 
+_CACHE_PATH = Path.home() / ".cache" / "maf" / "concurrent.sqlite"
+_CACHE_ENABLED = "--cache" in sys.argv[1:] or os.getenv("MAF_CONVERSATION_CACHE", "").lower() in ("1", "true")
+
+SEP = "-" * 60
+
+
+class ConversationCache:
+    """Persistent prompt -> aggregated conversation cache backed by sqlite."""
+
+    def __init__(self, path: Path = _CACHE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, messages TEXT NOT NULL)")
+
+    @staticmethod
+    def key(model: str, participants: list[tuple[str, str]], prompt: str) -> str:
+        """Build a cache key from the model, (name, instructions) pairs and the prompt.
+
+        Prompts differing only in case or whitespace share an entry; any change to the
+        model or an agent's instructions yields a new key.
+        """
+        normalized = " ".join(prompt.casefold().split())
+        return hashlib.sha256(json.dumps([model, participants, normalized]).encode()).hexdigest()
+
+    def get(self, key: str) -> list[ChatMessage] | None:
+        row = self._conn.execute("SELECT messages FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return [
+            ChatMessage(role=m["role"], text=m["text"], author_name=m["author_name"]) for m in json.loads(row[0])
+        ]
+
+    def put(self, key: str, messages: list[ChatMessage]) -> None:
+        payload = json.dumps(
+            [{"role": m.role.value, "text": m.text, "author_name": m.author_name} for m in messages]
+        )
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, messages) VALUES (?, ?)", (key, payload))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_RESEARCHER_INSTRUCTIONS = (
+    "You're an expert market and product researcher. Given a prompt, provide concise, factual insights,"
+    " opportunities, and risks."
+)
+_MARKETER_INSTRUCTIONS = (
+    "You're a creative marketing strategist. Craft compelling value propositions and target messaging"
+    " aligned to the prompt."
+)
+_LEGAL_INSTRUCTIONS = (
+    "You're a cautious legal/compliance reviewer. Highlight constraints, disclaimers, and policy concerns"
+    " based on the prompt."
+)
+
 
 async def main() -> None:
     # 1) Create three domain agents using AzureOpenAIChatClient
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+    chat_client = AzureOpenAIChatClient(ad_token_provider=token_provider)
 
     researcher = chat_client.create_agent(
-        instructions=(
-            "You're an expert market and product researcher. Given a prompt, provide concise, factual insights,"
-            " opportunities, and risks."
-        ),
+        instructions=_RESEARCHER_INSTRUCTIONS,
         name="researcher",
     )
 
     marketer = chat_client.create_agent(
-        instructions=(
-            "You're a creative marketing strategist. Craft compelling value propositions and target messaging"
-            " aligned to the prompt."
-        ),
+        instructions=_MARKETER_INSTRUCTIONS,
         name="marketer",
     )
 
     legal = chat_client.create_agent(
-        instructions=(
-            "You're a cautious legal/compliance reviewer. Highlight constraints, disclaimers, and policy concerns"
-            " based on the prompt."
-        ),
+        instructions=_LEGAL_INSTRUCTIONS,
         name="legal",
     )
 
     # 2) Build a concurrent workflow
     # Participants are either Agents (type of AgentProtocol) or Executors
-    workflow = ConcurrentBuilder().participants([researcher, marketer, legal]).build()
-
-    # 3) Run with a single prompt and pretty-print the final combined messages
-    events = await workflow.run("We are launching a new budget-friendly electric bike for urban commuters.")
-    outputs = events.get_outputs()
+    participants = [researcher, marketer, legal]
+    workflow = ConcurrentBuilder().participants(participants).build()
+
+    # 3) Run with a single prompt (or reuse a cached run) and pretty-print the final combined messages
+    prompt = "We are launching a new budget-friendly electric bike for urban commuters."
+    if not _CACHE_ENABLED:
+        outputs: list[Any] = (await workflow.run(prompt)).get_outputs()
+    else:
+        cache = ConversationCache()
+        cache_key = ConversationCache.key(
+            chat_client.model_id,
+            [(agent.name, agent.chat_options.instructions) for agent in participants],
+            prompt,
+        )
+        try:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                sys.stdout.write(f"[cache] Reusing cached conversation from {_CACHE_PATH}\n")
+                outputs = [cached]
+            else:
+                outputs = (await workflow.run(prompt)).get_outputs()
+                if outputs:
+                    cache.put(cache_key, outputs[-1])
+        finally:
+            cache.close()
 
     if outputs:
-        print("===== Final Aggregated Conversation (messages) =====")
+        buf = ["===== Final Aggregated Conversation (messages) ====="]
         for output in outputs:
             messages: list[ChatMessage] | Any = output
             for i, msg in enumerate(messages, start=1):
                 name = msg.author_name if msg.author_name else "user"
-                print(f"{'-' * 60}\n\n{i:02d} [{name}]:\n{msg.text}")
+                buf.append(f"{SEP}\n\n{i:02d} [{name}]:\n{msg.text}")
+        sys.stdout.write("\n".join(buf) + "\n")
 
     """
     Sample Output:
@@ -126,4 +207,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
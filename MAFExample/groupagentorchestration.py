@@ -1,7 +1,9 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
+import functools
 import logging
+import os
+import sys
 from typing import cast
 
 from agent_framework import (
@@ -13,9 +15,16 @@ from agent_framework import (
     WorkflowOutputEvent,
 )
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
 
-logging.basicConfig(level=logging.INFO)
+from _auth import token_provider
+from _runtime import runner
+
+# Framework internals log per message at INFO; override with e.g. MAF_LOG=INFO when debugging.
+# agent_framework already installs the root handler at import, so only the level is set;
+# unknown MAF_LOG values fall back to WARNING rather than failing at import.
+logging.getLogger().setLevel(
+    logging.getLevelNamesMapping().get(os.environ.get("MAF_LOG", "").upper(), logging.WARNING)
+)
 
 """
 Sample: Group Chat with Agent-Based Manager
@@ -30,17 +39,13 @@ Prerequisites:
 """
 
 
+@functools.lru_cache(maxsize=None)
 def _get_chat_client() -> AzureOpenAIChatClient:
-    return AzureOpenAIChatClient(credential=AzureCliCredential())
+    """Return the shared chat client so all agents reuse one credential and HTTP connection pool."""
+    return AzureOpenAIChatClient(ad_token_provider=token_provider)
 
 
-async def main() -> None:
-    # Create coordinator agent with structured output for speaker selection
-    # Note: response_format is enforced to ManagerSelectionResponse by set_manager()
-    coordinator = ChatAgent(
-        name="Coordinator",
-        description="Coordinates multi-agent collaboration by selecting speakers",
-        instructions="""
+_COORDINATOR_INSTRUCTIONS = """
 You coordinate a team conversation to solve the user's task.
 
 Review the conversation history and select the next participant to speak.
@@ -50,21 +55,32 @@ Guidelines:
 - Then have Writer synthesize the final answer
 - Only finish after both have contributed meaningfully
 - Allow for multiple rounds of information gathering if needed
-""",
+"""
+_RESEARCHER_INSTRUCTIONS = "Gather concise facts that help a teammate answer the question."
+_WRITER_INSTRUCTIONS = "Compose clear and structured answers using any notes provided."
+
+
+async def main() -> None:
+    # Create coordinator agent with structured output for speaker selection
+    # Note: response_format is enforced to ManagerSelectionResponse by set_manager()
+    coordinator = ChatAgent(
+        name="Coordinator",
+        description="Coordinates multi-agent collaboration by selecting speakers",
+        instructions=_COORDINATOR_INSTRUCTIONS,
         chat_client=_get_chat_client(),
     )
 
     researcher = ChatAgent(
         name="Researcher",
         description="Collects relevant background information",
-        instructions="Gather concise facts that help a teammate answer the question.",
+        instructions=_RESEARCHER_INSTRUCTIONS,
         chat_client=_get_chat_client(),
     )
 
     writer = ChatAgent(
         name="Writer",
         description="Synthesizes polished answers from gathered information",
-        instructions="Compose clear and structured answers using any notes provided.",
+        instructions=_WRITER_INSTRUCTIONS,
         chat_client=_get_chat_client(),
     )
 
@@ -97,16 +113,14 @@ Guidelines:
             final_conversation = cast(list[ChatMessage], event.data)
 
     if final_conversation and isinstance(final_conversation, list):
-        print("\n\n" + "=" * 80)
-        print("FINAL CONVERSATION")
-        print("=" * 80)
-        for msg in final_conversation:
-            author = getattr(msg, "author_name", "Unknown")
-            text = getattr(msg, "text", str(msg))
-            print(f"\n[{author}]")
-            print(text)
-            print("-" * 80)
+        separator = "-" * 80
+        lines = ["\n\n" + "=" * 80, "FINAL CONVERSATION", "=" * 80]
+        lines += (
+            f"\n[{getattr(msg, 'author_name', 'Unknown')}]\n{getattr(msg, 'text', str(msg))}\n{separator}"
+            for msg in final_conversation
+        )
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
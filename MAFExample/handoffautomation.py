@@ -1,7 +1,9 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-import asyncio
 import logging
+import os
+import sys
+import time
 from typing import cast
 
 from agent_framework import (
@@ -15,9 +17,16 @@ from agent_framework import (
     WorkflowOutputEvent,
 )
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
 
-logging.basicConfig(level=logging.ERROR)
+from _auth import token_provider
+from _runtime import runner
+from _termination import make_message_count_limit
+
+# agent_framework already installs the root handler at import, so only the level is set;
+# unknown MAF_LOG values fall back to ERROR rather than failing at import.
+logging.getLogger().setLevel(
+    logging.getLevelNamesMapping().get(os.environ.get("MAF_LOG", "").upper(), logging.ERROR)
+)
 
 """Sample: Autonomous handoff workflow with agent iteration.
 
@@ -39,70 +48,120 @@ Key Concepts:
 """
 
 
+# Hosted tools are stateless descriptors executed by the service, so one instance can be
+# shared by every search-capable agent.
+_SEARCH_TOOL = HostedWebSearchTool()
+
+
+_COORDINATOR_INSTRUCTIONS = (
+    "You are a coordinator. You break down a user query into a research task and a summary task. "
+    "Assign the two tasks to the appropriate specialists, one after the other."
+)
+_RESEARCH_INSTRUCTIONS = (
+    "You are a research specialist that explores topics thoroughly on the Microsoft Learn Site."
+    "When given a research task, break it down into multiple aspects and explore each one. "
+    "Continue your research across multiple responses - don't try to finish everything in one "
+    "response. After each response, think about what else needs to be explored. When you have "
+    "covered the topic comprehensively (at least 3-4 different aspects), return control to the "
+    "coordinator. Keep each individual response focused on one aspect."
+)
+_SUMMARY_INSTRUCTIONS = (
+    "You summarize research findings. Provide a concise, well-organized summary. When done, return "
+    "control to the coordinator."
+)
+
+
 def create_agents(
     chat_client: AzureOpenAIChatClient,
 ) -> tuple[ChatAgent, ChatAgent, ChatAgent]:
     """Create coordinator and specialists for autonomous iteration."""
     coordinator = chat_client.create_agent(
-        instructions=(
-            "You are a coordinator. You break down a user query into a research task and a summary task. "
-            "Assign the two tasks to the appropriate specialists, one after the other."
-        ),
+        instructions=_COORDINATOR_INSTRUCTIONS,
         name="coordinator",
     )
 
     research_agent = chat_client.create_agent(
-        instructions=(
-            "You are a research specialist that explores topics thoroughly on the Microsoft Learn Site."
-            "When given a research task, break it down into multiple aspects and explore each one. "
-            "Continue your research across multiple responses - don't try to finish everything in one "
-            "response. After each response, think about what else needs to be explored. When you have "
-            "covered the topic comprehensively (at least 3-4 different aspects), return control to the "
-            "coordinator. Keep each individual response focused on one aspect."
-        ),
+        instructions=_RESEARCH_INSTRUCTIONS,
         name="research_agent",
-        tools=[HostedWebSearchTool()],
+        tools=[_SEARCH_TOOL],
     )
 
     summary_agent = chat_client.create_agent(
-        instructions=(
-            "You summarize research findings. Provide a concise, well-organized summary. When done, return "
-            "control to the coordinator."
-        ),
+        instructions=_SUMMARY_INSTRUCTIONS,
         name="summary_agent",
     )
 
     return coordinator, research_agent, summary_agent
 
 
-last_response_id: str | None = None
+def _is_coordinator_reply(message: ChatMessage) -> bool:
+    return message.author_name == "coordinator" and message.role.value == "assistant"
+
+
+PREVIEW = 200
+
 
+def _short(text: str) -> str:
+    """Truncate text to PREVIEW characters for the final conversation summary."""
+    return text if len(text) <= PREVIEW else f"{text[:PREVIEW]}..."
+
+
+class EventDisplay:
+    """Print streamed agent updates and the final conversation snapshot for one workflow run.
+
+    All display state lives on the instance, so concurrent runs in the same process each
+    get their own. Streamed tokens are collected in a buffer and written to stdout in one
+    call on speaker change or every FLUSH_INTERVAL seconds, instead of one print per token.
+    """
 
-def _display_event(event: WorkflowEvent) -> None:
-    """Print the final conversation snapshot from workflow output events."""
-    if isinstance(event, AgentRunUpdateEvent) and event.data:
-        update: AgentRunResponseUpdate = event.data
-        if not update.text:
-            return
-        global last_response_id
-        if update.response_id != last_response_id:
-            last_response_id = update.response_id
-            print(f"\n- {update.author_name}: ", flush=True, end="")
-        print(event.data, flush=True, end="")
-    elif isinstance(event, WorkflowOutputEvent):
-        conversation = cast(list[ChatMessage], event.data)
-        print("\n=== Final Conversation (Autonomous with Iteration) ===")
-        for message in conversation:
-            speaker = message.author_name or message.role.value
-            text_preview = message.text[:200] + "..." if len(message.text) > 200 else message.text
-            print(f"- {speaker}: {text_preview}")
-        print(f"\nTotal messages: {len(conversation)}")
-        print("=====================================================")
+    FLUSH_INTERVAL = 0.05
+
+    def __init__(self) -> None:
+        self._last_response_id: str | None = None
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._encoding = sys.stdout.encoding or "utf-8"
+
+    def flush(self) -> None:
+        """Write any buffered streaming output to stdout."""
+        if self._buffer:
+            sys.stdout.flush()
+            # Text-only streams (StringIO, pytest capsys, some IDE consoles) have no buffer
+            buffer = getattr(sys.stdout, "buffer", None)
+            if buffer is not None:
+                buffer.write(self._buffer)
+                buffer.flush()
+            else:
+                sys.stdout.write(self._buffer.decode(self._encoding, "replace"))
+                sys.stdout.flush()
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        if isinstance(event, AgentRunUpdateEvent) and event.data:
+            update: AgentRunResponseUpdate = event.data
+            if not update.text:
+                return
+            if update.response_id != self._last_response_id:
+                self.flush()
+                self._last_response_id = update.response_id
+                self._buffer.extend(f"\n- {update.author_name}: ".encode(self._encoding, "replace"))
+            self._buffer.extend(update.text.encode(self._encoding, "replace"))
+            if time.monotonic() - self._last_flush > self.FLUSH_INTERVAL:
+                self.flush()
+        elif isinstance(event, WorkflowOutputEvent):
+            self.flush()
+            conversation = cast(list[ChatMessage], event.data)
+            lines = ["\n=== Final Conversation (Autonomous with Iteration) ==="]
+            lines += (f"- {m.author_name or m.role.value}: {_short(m.text)}" for m in conversation)
+            lines.append(f"\nTotal messages: {len(conversation)}")
+            lines.append("=====================================================")
+            sys.stdout.write("\n".join(lines) + "\n")
 
 
 async def main() -> None:
     """Run an autonomous handoff workflow with specialist iteration enabled."""
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+    chat_client = AzureOpenAIChatClient(ad_token_provider=token_provider)
     coordinator, research_agent, summary_agent = create_agents(chat_client)
 
     # Build the workflow with autonomous mode
@@ -119,16 +178,17 @@ async def main() -> None:
         .with_interaction_mode("autonomous", autonomous_turn_limit=15)
         .with_termination_condition(
             # Terminate after coordinator provides 5 assistant responses
-            lambda conv: sum(1 for msg in conv if msg.author_name == "coordinator" and msg.role.value == "assistant")
-            >= 5
+            make_message_count_limit(_is_coordinator_reply, 5)
         )
         .build()
     )
 
     request = "Perform a comprehensive research on Microsoft Agent Framework."
     print("Request:", request)
+    display = EventDisplay()
     async for event in workflow.run_stream(request):
-        _display_event(event)
+        display(event)
+    display.flush()
 
     """
     Expected behavior:
@@ -144,4 +204,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner(main())
@@ -24,8 +24,9 @@ Prerequisites:
 """
 
 import asyncio
-from collections.abc import AsyncIterable
-from typing import cast
+from collections import deque
+from collections.abc import AsyncIterable, Callable
+from typing import Any, cast
 
 from agent_framework import (
     ChatMessage,
@@ -38,7 +39,14 @@ from agent_framework import (
     WorkflowStatusEvent,
 )
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
+
+from _auth import token_provider
+from _jsonlog import JSON_LOG, log_message
+from _termination import make_message_count_limit
+
+
+def _is_user_message(message: ChatMessage) -> bool:
+    return message.role.value == "user"
 
 
 def create_agents(chat_client: AzureOpenAIChatClient):
@@ -89,56 +97,85 @@ def create_agents(chat_client: AzureOpenAIChatClient):
     return triage, replacement, delivery, billing
 
 
-async def _drain(stream: AsyncIterable[WorkflowEvent]) -> list[WorkflowEvent]:
-    """Collect all events from an async stream into a list."""
-    return [event async for event in stream]
-
-
-def _handle_events(events: list[WorkflowEvent]) -> list[RequestInfoEvent]:
-    """Process workflow events and extract pending user input requests."""
+def _on_status(event: WorkflowStatusEvent, requests: list[RequestInfoEvent]) -> None:
+    """Print idle states so the request/response rhythm is visible."""
+    if JSON_LOG:
+        return
+    if event.state in {WorkflowRunState.IDLE, WorkflowRunState.IDLE_WITH_PENDING_REQUESTS}:
+        print(f"[status] {event.state.name}")
+
+
+def _on_output(event: WorkflowOutputEvent, requests: list[RequestInfoEvent]) -> None:
+    """Print the final conversation when the workflow terminates."""
+    conversation = cast(list[ChatMessage], event.data)
+    if isinstance(conversation, list):
+        if not JSON_LOG:
+            print("\n=== Final Conversation ===")
+        for message in conversation:
+            text = message.text
+            # Filter out messages with no text (tool calls)
+            if not text.strip():
+                continue
+            speaker = message.author_name or message.role.value
+            if JSON_LOG:
+                log_message(speaker, text)
+            else:
+                print(f"- {speaker}: {text}")
+        if not JSON_LOG:
+            print("==========================")
+
+
+def _on_request(event: RequestInfoEvent, requests: list[RequestInfoEvent]) -> None:
+    """Show the handoff prompt and keep the request for the next response round."""
+    if isinstance(event.data, HandoffUserInputRequest) and not JSON_LOG:
+        _print_handoff_request(event.data)
+    requests.append(event)
+
+
+# Event type -> handler. Events of any other type pass through untouched.
+_EVENT_HANDLERS: dict[type[WorkflowEvent], Callable[[Any, list[RequestInfoEvent]], None]] = {
+    WorkflowStatusEvent: _on_status,
+    WorkflowOutputEvent: _on_output,
+    RequestInfoEvent: _on_request,
+}
+
+
+async def _consume(stream: AsyncIterable[WorkflowEvent]) -> list[RequestInfoEvent]:
+    """Process workflow events as they arrive and return pending user input requests.
+
+    Only RequestInfoEvents are kept; everything else is printed and released immediately.
+    """
     requests: list[RequestInfoEvent] = []
 
-    for event in events:
-        if isinstance(event, WorkflowStatusEvent) and event.state in {
-            WorkflowRunState.IDLE,
-            WorkflowRunState.IDLE_WITH_PENDING_REQUESTS,
-        }:
-            print(f"[status] {event.state.name}")
-
-        elif isinstance(event, WorkflowOutputEvent):
-            conversation = cast(list[ChatMessage], event.data)
-            if isinstance(conversation, list):
-                print("\n=== Final Conversation ===")
-                for message in conversation:
-                    # Filter out messages with no text (tool calls)
-                    if not message.text.strip():
-                        continue
-                    speaker = message.author_name or message.role.value
-                    print(f"- {speaker}: {message.text}")
-                print("==========================")
-
-        elif isinstance(event, RequestInfoEvent):
-            if isinstance(event.data, HandoffUserInputRequest):
-                _print_handoff_request(event.data)
-            requests.append(event)
+    async for event in stream:
+        handler = _EVENT_HANDLERS.get(type(event))
+        if handler is not None:
+            handler(event, requests)
 
     return requests
 
 
+_PREVIEW_MESSAGES = 5
+
+
 def _print_handoff_request(request: HandoffUserInputRequest) -> None:
     """Display a user input request with conversation context."""
     print("\n=== User Input Requested ===")
-    # Filter out messages with no text for cleaner display
-    messages_with_text = [msg for msg in request.conversation if msg.text.strip()]
-    print(f"Last {len(messages_with_text)} messages in conversation:")
-    for message in messages_with_text[-5:]:  # Show last 5 for brevity
-        speaker = message.author_name or message.role.value
-        text = message.text[:100] + "..." if len(message.text) > 100 else message.text
-        print(f"  {speaker}: {text}")
+    # Walk back from the end, skipping messages with no text, until enough are found
+    tail: deque[tuple[str, str]] = deque()
+    for message in reversed(request.conversation):
+        text = message.text
+        if text.strip():
+            tail.appendleft((message.author_name or message.role.value, text))
+            if len(tail) == _PREVIEW_MESSAGES:
+                break
+    print(f"Last {len(tail)} messages in conversation:")
+    for speaker, text in tail:
+        print(f"  {speaker}: {text if len(text) <= 100 else text[:100] + '...'}")
     print("============================")
 
 
-async def main() -> None:
+async def main(chat_client: AzureOpenAIChatClient | None = None) -> None:
     """Demonstrate specialist-to-specialist handoffs in a multi-tier support scenario.
 
     This sample shows:
@@ -151,8 +188,11 @@ async def main() -> None:
     - triage_agent → replacement_agent, delivery_agent, billing_agent
     - replacement_agent → delivery_agent, billing_agent
     - delivery_agent → billing_agent
+
+    Pass ``chat_client`` to reuse an existing client (and its connection pool) across runs.
     """
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+    if chat_client is None:
+        chat_client = AzureOpenAIChatClient(ad_token_provider=token_provider)
     triage, replacement, delivery, billing = create_agents(chat_client)
 
     # Configure multi-tier handoffs using fluent add_handoff() API
@@ -169,7 +209,7 @@ async def main() -> None:
         # Termination condition: Stop when more than 3 user messages exist.
         # This allows agents to respond to the 3rd user message before the 4th triggers termination.
         # In this sample: initial message + 3 scripted responses = 4 messages, then workflow ends.
-        .with_termination_condition(lambda conv: sum(1 for msg in conv if msg.role.value == "user") > 3)
+        .with_termination_condition(make_message_count_limit(_is_user_message, 3 + 1))
         .build()
     )
 
@@ -184,27 +224,29 @@ async def main() -> None:
         "Thank you!",  # Final response to trigger termination after billing agent answers
     ]
 
-    print("\n" + "=" * 80)
-    print("SPECIALIST-TO-SPECIALIST HANDOFF DEMONSTRATION")
-    print("=" * 80)
-    print("\nScenario: Customer needs replacement + shipping info + billing confirmation")
-    print("Expected flow: User → Triage → Replacement → Delivery → Billing → User")
-    print("=" * 80 + "\n")
+    # With --json-log only the final conversation is written (as JSON lines), so every
+    # plain-text line below is skipped; user messages are part of that conversation
+    if not JSON_LOG:
+        print("\n" + "=" * 80)
+        print("SPECIALIST-TO-SPECIALIST HANDOFF DEMONSTRATION")
+        print("=" * 80)
+        print("\nScenario: Customer needs replacement + shipping info + billing confirmation")
+        print("Expected flow: User → Triage → Replacement → Delivery → Billing → User")
+        print("=" * 80 + "\n")
 
-    # Start workflow with initial message
-    print(f"[User]: {scripted_responses[0]}\n")
-    events = await _drain(workflow.run_stream(scripted_responses[0]))
-    pending_requests = _handle_events(events)
+        # Start workflow with initial message
+        print(f"[User]: {scripted_responses[0]}\n")
+    pending_requests = await _consume(workflow.run_stream(scripted_responses[0]))
 
     # Process scripted responses
     response_index = 1
     while pending_requests and response_index < len(scripted_responses):
         user_response = scripted_responses[response_index]
-        print(f"\n[User]: {user_response}\n")
+        if not JSON_LOG:
+            print(f"\n[User]: {user_response}\n")
 
         responses = {req.request_id: user_response for req in pending_requests}
-        events = await _drain(workflow.send_responses_streaming(responses))
-        pending_requests = _handle_events(events)
+        pending_requests = await _consume(workflow.send_responses_streaming(responses))
 
         response_index += 1
 
@@ -236,7 +278,7 @@ async def main() -> None:
 
 
     === User Input Requested ===
-    Last 8 messages in conversation:
+    Last 5 messages in conversation:
     delivery_agent: For your replacement request and delivery details regarding order 12345, I'll connect you to the app...
     billing_agent: I don’t have access to order details. Please contact the seller or customer service directly for rep...
     user: The item arrived damaged. I'd like a replacement shipped to the same address.
@@ -249,7 +291,7 @@ async def main() -> None:
 
 
     === User Input Requested ===
-    Last 11 messages in conversation:
+    Last 5 messages in conversation:
     triage_agent: I'm connecting you to our replacement agent who will assist you with getting a replacement shipped t...
     replacement_agent: Thank you for the info. I'll start the replacement process for your damaged item on order 12345 and ...
     user: Great! Can you confirm the shipping cost won't be charged again?
@@ -14,22 +14,20 @@
 
 # if __name__ == "__main__":
 #     asyncio.run(main())
-import os
 import asyncio
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
-from dotenv import load_dotenv
 
-load_dotenv()
+from _settings import SETTINGS
 
 async def main():
     # Create a chat client using API key (no Entra ID, no AzureCliCredential)
     chat_client = AzureOpenAIChatClient(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-    )  # reads env vars by default
+            api_key=SETTINGS.api_key,
+            api_version=SETTINGS.api_version,
+            deployment_name=SETTINGS.deployment_name,
+            azure_endpoint=SETTINGS.endpoint
+    )  # values read from env / .env once in _settings
 
     # Create the agent directly over the chat client
     async with ChatAgent(
@@ -1,29 +1,95 @@
-import os
-from openai import AsyncAzureOpenAI
-from dotenv import load_dotenv
+import asyncio
+import re
+import time
+from collections import OrderedDict
 
-load_dotenv()
+import httpx
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
 
+from _settings import SETTINGS
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    h2 = None  # h2 is optional; without it the pool speaks HTTP/1.1
+
+# One long-lived client; its connection pool is sized for concurrent callers and kept warm
 client = AsyncAzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_key=SETTINGS.api_key,
+    api_version=SETTINGS.api_version,
+    azure_endpoint=SETTINGS.endpoint,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        http2=h2 is not None,
+    ),
 )
+MODEL = SETTINGS.deployment_name
+
+class _TTLCache:
+    """Small LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: tuple) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+# Answers to repeated prompts (demo scripts, health checks) are served from here
+_CACHE = _TTLCache(maxsize=1024, ttl=3600)
 
-async def get_llm_response(user_message: str) -> str:
+# Prompts whose answer depends on when they are asked are never cached
+_DYNAMIC = re.compile(r"\b(now|today|tonight|tomorrow|yesterday|current|latest|time|date)\b|\d{1,2}:\d{2}", re.I)
+
+
+async def get_llm_response(user_message: str, *, cache: _TTLCache | None = _CACHE) -> str:
+    key = None
+    if cache is not None and not _DYNAMIC.search(user_message):
+        key = (MODEL, user_message.strip().lower())
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
     try:
         response = await client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            model=MODEL,
             messages=[{"role": "user", "content": user_message}]
         )
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        if key is not None and content is not None:
+            cache.set(key, content)
+        return content
     except Exception as e:
         print(f"OpenAI API error: {str(e)}")
         return "⚠️ Sorry, I couldn't process your request."
 
-if __name__ == "__main__":
-    import asyncio
 
+async def get_llm_responses(user_messages: list[str], *, concurrency: int = 8) -> list[str]:
+    """Answer independent prompts concurrently, at most ``concurrency`` requests in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(user_message: str) -> str:
+        async with semaphore:
+            return await get_llm_response(user_message)
+
+    return await asyncio.gather(*(one(m) for m in user_messages))
+
+if __name__ == "__main__":
     user_input = "Tell me a joke about a pirate."
     response = asyncio.run(get_llm_response(user_input))
     print(f"Response from LLM: {response}")
\ No newline at end of file
@@ -5,7 +5,9 @@ from typing import cast
 
 from agent_framework import ChatMessage, Role, SequentialBuilder, WorkflowOutputEvent
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
+
+from _auth import token_provider
+from _jsonlog import JSON_LOG, log_message
 
 """
 Sample: Sequential workflow (agent-focused API) with shared conversation context
@@ -27,9 +29,10 @@ Prerequisites:
 """
 
 
-async def main() -> None:
-    # 1) Create agents
-    chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+async def main(chat_client: AzureOpenAIChatClient | None = None) -> None:
+    # 1) Create agents (reuse the caller's client and connection pool when given)
+    if chat_client is None:
+        chat_client = AzureOpenAIChatClient(ad_token_provider=token_provider)
 
     writer = chat_client.create_agent(
         instructions=("You are a concise copywriter. Provide a single, punchy marketing sentence based on the prompt."),
@@ -44,15 +47,18 @@ async def main() -> None:
     # 2) Build sequential workflow: writer -> reviewer
     workflow = SequentialBuilder().participants([writer, reviewer]).build()
 
-    # 3) Run and collect outputs
-    outputs: list[list[ChatMessage]] = []
+    # 3) Run and keep only the latest output (the final conversation)
+    last_output: list[ChatMessage] | None = None
     async for event in workflow.run_stream("Write a tagline for a budget-friendly eBike."):
         if isinstance(event, WorkflowOutputEvent):
-            outputs.append(cast(list[ChatMessage], event.data))
+            last_output = cast(list[ChatMessage], event.data)
 
-    if outputs:
+    if last_output and JSON_LOG:
+        for msg in last_output:
+            log_message(msg.author_name or ("assistant" if msg.role == Role.ASSISTANT else "user"), msg.text)
+    elif last_output:
         print("===== Final Conversation =====")
-        for i, msg in enumerate(outputs[-1], start=1):
+        for i, msg in enumerate(last_output, start=1):
             name = msg.author_name or ("assistant" if msg.role == Role.ASSISTANT else "user")
             print(f"{'-' * 60}\n{i:02d} [{name}]\n{msg.text}")
 
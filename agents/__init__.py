@@ -3,26 +3,50 @@ MAF Agents - Entry point and registry
 
 This module provides the agent factory registry and workflow steps.
 Individual agents are defined in separate files.
+
+Agent modules (and the agent_framework / Azure SDKs they pull in) are imported
+lazily, on first access to an agent class or first call of its factory. This only
+helps callers that import the package without building agents (tests, tooling,
+WORKFLOW_STEPS lookups): build_all_agents() reads every agent's TOOLS up front,
+so it imports all agent modules anyway.
 """
-from typing import Dict, Any
+import asyncio
+from importlib import import_module
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Any, Tuple
+
+if TYPE_CHECKING:
+    from agent_framework import ChatAgent
+
+
+# Step name -> (module, class) of its agent; modules are imported on demand
+_AGENT_CLASSES: Dict[str, Tuple[str, str]] = {
+    "intake": ("agents.intake_agent", "IntakeAgent"),
+    "verification": ("agents.verification_agent", "VerificationAgent"),
+    "eligibility": ("agents.eligibility_agent", "EligibilityAgent"),
+    "recommendation": ("agents.recommendation_agent", "RecommendationAgent"),
+    "compliance": ("agents.compliance_agent", "ComplianceAgent"),
+    "action": ("agents.action_agent", "ActionAgent"),
+}
+
+
+def _agent_class(step_name: str) -> Any:
+    """Import (once) and return the agent class for a workflow step."""
+    module_name, class_name = _AGENT_CLASSES[step_name]
+    return getattr(import_module(module_name), class_name)
+
+
+def _lazy_factory(step_name: str) -> Callable[[], Awaitable["ChatAgent"]]:
+    """Wrap an agent's create() so its module is only imported when the agent is built."""
+    async def create() -> "ChatAgent":
+        return await _agent_class(step_name).create()
 
-# Import all agents
-from agents.intake_agent import IntakeAgent
-from agents.verification_agent import VerificationAgent
-from agents.eligibility_agent import EligibilityAgent
-from agents.recommendation_agent import RecommendationAgent
-from agents.compliance_agent import ComplianceAgent
-from agents.action_agent import ActionAgent
+    create.__name__ = create.__qualname__ = f"create_{step_name}_agent"
+    return create
 
 
 # Agent factory registry
 AGENT_FACTORIES: Dict[str, Any] = {
-    "intake": IntakeAgent.create,
-    "verification": VerificationAgent.create,
-    "eligibility": EligibilityAgent.create,
-    "recommendation": RecommendationAgent.create,
-    "compliance": ComplianceAgent.create,
-    "action": ActionAgent.create,
+    step_name: _lazy_factory(step_name) for step_name in _AGENT_CLASSES
 }
 
 
@@ -37,10 +61,49 @@ WORKFLOW_STEPS = [
 ]
 
 
+# Steps paired with their factories, resolved once at import
+WORKFLOW_PLAN: Tuple[Tuple[str, Callable[[], Awaitable["ChatAgent"]]], ...] = tuple(
+    (name, AGENT_FACTORIES[name]) for name in WORKFLOW_STEPS
+)
+
+
+def _agent_tools() -> Dict[str, tuple]:
+    """MCP tools required by each agent, keyed by step name."""
+    return {step_name: _agent_class(step_name).TOOLS for step_name in _AGENT_CLASSES}
+
+
+def __getattr__(name: str) -> Any:
+    """PEP 562 hook: resolve agent classes and AGENT_TOOLS on first access."""
+    for step_name, (_, class_name) in _AGENT_CLASSES.items():
+        if class_name == name:
+            value = _agent_class(step_name)
+            break
+    else:
+        if name != "AGENT_TOOLS":
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = _agent_tools()
+    globals()[name] = value
+    return value
+
+
+async def build_all_agents() -> Dict[str, "ChatAgent"]:
+    """Create every registered agent concurrently, keyed by step name."""
+    from maf_tools import prefetch_tools
+
+    # Load the union of all agents' tools in one MCP fetch before the factories run
+    await prefetch_tools(set().union(*_agent_tools().values()))
+    names, factories = zip(*WORKFLOW_PLAN)
+    agents = await asyncio.gather(*(factory() for factory in factories))
+    return dict(zip(names, agents))
+
+
 # Export for backward compatibility
 __all__ = [
     "AGENT_FACTORIES",
+    "AGENT_TOOLS",
     "WORKFLOW_STEPS",
+    "WORKFLOW_PLAN",
+    "build_all_agents",
     "IntakeAgent",
     "VerificationAgent",
     "EligibilityAgent",
@@ -2,7 +2,7 @@
 Action Agent - Takes final actions based on workflow results
 """
 from agent_framework import ChatAgent
-from agents.utils import create_azure_chat_client, load_prompt
+from agents.utils import create_azure_chat_client, get_or_create_agent, load_prompt
 from maf_tools import get_maf_tools_for_agent
 
 
@@ -14,14 +14,21 @@ class ActionAgent:
     Tools: send_kyc_approved_email, send_kyc_pending_email, save_kyc_session_state
     """
     
+    TOOLS = (
+        "send_kyc_approved_email",
+        "send_kyc_pending_email",
+        "save_kyc_session_state",
+    )
+    
     @staticmethod
     async def create() -> ChatAgent:
+        """Create the Action agent, built once per process and reused."""
+        return await get_or_create_agent("action", ActionAgent._build)
+    
+    @staticmethod
+    async def _build() -> ChatAgent:
         """Create the Action agent with MCP tools."""
-        tools = await get_maf_tools_for_agent([
-            "send_kyc_approved_email",
-            "send_kyc_pending_email",
-            "save_kyc_session_state",
-        ])
+        tools = await get_maf_tools_for_agent(list(ActionAgent.TOOLS))
         
         chat_client = create_azure_chat_client()
         instructions = load_prompt("action")
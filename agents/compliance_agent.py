@@ -2,7 +2,7 @@
 Compliance Agent - Performs final compliance checks
 """
 from agent_framework import ChatAgent
-from agents.utils import create_azure_chat_client, load_prompt
+from agents.utils import create_azure_chat_client, get_or_create_agent, load_prompt
 from maf_tools import get_maf_tools_for_agent
 
 
@@ -15,14 +15,21 @@ class ComplianceAgent:
     Tools: search_policies, check_compliance, get_policy_requirements
     """
     
+    TOOLS = (
+        "search_policies",
+        "check_compliance",
+        "get_policy_requirements",
+    )
+    
     @staticmethod
     async def create() -> ChatAgent:
+        """Create the Compliance agent, built once per process and reused."""
+        return await get_or_create_agent("compliance", ComplianceAgent._build)
+    
+    @staticmethod
+    async def _build() -> ChatAgent:
         """Create the Compliance agent with MCP tools."""
-        tools = await get_maf_tools_for_agent([
-            "search_policies",
-            "check_compliance",
-            "get_policy_requirements",
-        ])
+        tools = await get_maf_tools_for_agent(list(ComplianceAgent.TOOLS))
         
         chat_client = create_azure_chat_client()
         instructions = load_prompt("compliance")
@@ -2,7 +2,7 @@
 Intake Agent - Collects initial customer information
 """
 from agent_framework import ChatAgent
-from agents.utils import create_azure_chat_client, load_prompt
+from agents.utils import create_azure_chat_client, get_or_create_agent, load_prompt
 from maf_tools import get_maf_tools_for_agent
 
 
@@ -14,13 +14,20 @@ class IntakeAgent:
     Tools: get_customer_by_email, get_customer_history
     """
     
+    TOOLS = (
+        "get_customer_by_email",
+        "get_customer_history",
+    )
+    
     @staticmethod
     async def create() -> ChatAgent:
+        """Create the Intake agent, built once per process and reused."""
+        return await get_or_create_agent("intake", IntakeAgent._build)
+    
+    @staticmethod
+    async def _build() -> ChatAgent:
         """Create the Intake agent with MCP tools."""
-        tools = await get_maf_tools_for_agent([
-            "get_customer_by_email",
-            "get_customer_history",
-        ])
+        tools = await get_maf_tools_for_agent(list(IntakeAgent.TOOLS))
         
         chat_client = create_azure_chat_client()
         instructions = load_prompt("intake")
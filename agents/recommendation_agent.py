@@ -2,7 +2,7 @@
 Recommendation Agent - Provides product/service recommendations
 """
 from agent_framework import ChatAgent
-from agents.utils import create_azure_chat_client, load_prompt
+from agents.utils import create_azure_chat_client, get_or_create_agent, load_prompt
 from maf_tools import get_maf_tools_for_agent
 
 
@@ -14,13 +14,20 @@ class RecommendationAgent:
     Tools: get_customer_history, search_policies
     """
     
+    TOOLS = (
+        "get_customer_history",
+        "search_policies",
+    )
+    
     @staticmethod
     async def create() -> ChatAgent:
+        """Create the Recommendation agent, built once per process and reused."""
+        return await get_or_create_agent("recommendation", RecommendationAgent._build)
+    
+    @staticmethod
+    async def _build() -> ChatAgent:
         """Create the Recommendation agent with MCP tools."""
-        tools = await get_maf_tools_for_agent([
-            "get_customer_history",
-            "search_policies",
-        ])
+        tools = await get_maf_tools_for_agent(list(RecommendationAgent.TOOLS))
         
         chat_client = create_azure_chat_client()
         instructions = load_prompt("recommendation")
@@ -2,27 +2,124 @@
 Shared utilities for MAF agents
 """
 import os
+import asyncio
 import logging
+from functools import lru_cache
 from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from agent_framework import ChatAgent
 from agent_framework.azure import AzureOpenAIChatClient
 from azure.identity import AzureCliCredential
+from mcp_client import on_client_reset
 
 logger = logging.getLogger("kyc.maf_agents")
 
 
+@lru_cache(maxsize=1)
+def get_azure_credential() -> AzureCliCredential:
+    """Shared Azure CLI credential, so token acquisition is cached process-wide."""
+    return AzureCliCredential()
+
+
+@lru_cache(maxsize=1)
 def create_azure_chat_client() -> AzureOpenAIChatClient:
-    """Create Azure OpenAI chat client for MAF agents."""
+    """
+    Get the Azure OpenAI chat client shared by all MAF agents.
+    
+    Built once per process so every agent reuses the same connection pool. The client
+    is long-lived: callers must not close it between requests.
+    """
     try:
         return AzureOpenAIChatClient(
-            credential=AzureCliCredential() if not os.getenv("AZURE_OPENAI_API_KEY") else None
+            credential=get_azure_credential() if not os.getenv("AZURE_OPENAI_API_KEY") else None
         )
     except Exception as e:
         logger.warning(f"Could not create AzureOpenAIChatClient with CLI credential: {e}")
         return AzureOpenAIChatClient()
 
 
+_PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+# Prompt text keyed by agent name, read from disk once at import
+_PROMPT_CACHE: Dict[str, str] = {}
+
+
+def _preload_prompts() -> None:
+    """Read every *_prompt.txt into _PROMPT_CACHE so agent factories never touch the disk."""
+    _PROMPT_CACHE.clear()
+    for prompt_file in _PROMPTS_DIR.glob("*_prompt.txt"):
+        _PROMPT_CACHE[prompt_file.name[: -len("_prompt.txt")]] = prompt_file.read_text(encoding="utf-8")
+
+
 def load_prompt(agent_name: str) -> str:
-    """Load prompt from file."""
-    prompt_file = Path(__file__).parent / "prompts" / f"{agent_name}_prompt.txt"
-    with open(prompt_file, "r") as f:
-        return f.read()
+    """
+    Load prompt from file.
+    
+    Served from the prompts preloaded at import; a prompt added later is read on
+    first use. Call reload_prompts() to pick up edited prompts.
+    """
+    try:
+        return _PROMPT_CACHE[agent_name]
+    except KeyError:
+        prompt_file = _PROMPTS_DIR / f"{agent_name}_prompt.txt"
+        prompt = _PROMPT_CACHE[agent_name] = prompt_file.read_text(encoding="utf-8")
+        return prompt
+
+
+reload_prompts = _preload_prompts
+
+_preload_prompts()
+
+# Built agents keyed by name, with one lock per name so different agents still build concurrently.
+# The locks belong to the event loop that created them (an asyncio.Lock binds to its loop),
+# so a new loop (separate asyncio.run() calls, TestClients) gets a fresh set.
+_AGENTS: Dict[str, ChatAgent] = {}
+_AGENT_LOCKS: Optional[Tuple[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]] = None
+
+
+def _agent_lock(name: str) -> asyncio.Lock:
+    """Return the build lock for `name` in the running event loop."""
+    global _AGENT_LOCKS
+    loop = asyncio.get_running_loop()
+    if _AGENT_LOCKS is None or _AGENT_LOCKS[0] is not loop:
+        _AGENT_LOCKS = (loop, {})
+    locks = _AGENT_LOCKS[1]
+    lock = locks.get(name)
+    if lock is None:
+        lock = locks[name] = asyncio.Lock()
+    return lock
+
+
+async def get_or_create_agent(name: str, factory: Callable[[], Awaitable[ChatAgent]]) -> ChatAgent:
+    """
+    Return the cached agent for `name`, building it with `factory` on first use.
+    
+    An agent that comes back without any tools (MCP unavailable) is returned but not
+    cached, so the next call retries the tool load.
+    """
+    agent = _AGENTS.get(name)
+    if agent is not None:
+        return agent
+    
+    async with _agent_lock(name):
+        agent = _AGENTS.get(name)
+        if agent is None:
+            agent = await factory()
+            if len(agent.chat_options.tools or ()):
+                _AGENTS[name] = agent
+            else:
+                logger.warning(f"Agent '{name}' was built without tools; not caching it")
+    return agent
+
+
+@on_client_reset
+def clear_agent_cache() -> None:
+    """
+    Drop cached agents so the next create() rebuilds them (tests, prompt reloads).
+    
+    Also runs whenever the global MCP client is replaced or closed, since cached
+    agents hold tools bound to that client.
+    """
+    global _AGENT_LOCKS
+    _AGENTS.clear()
+    _AGENT_LOCKS = None
@@ -2,7 +2,7 @@
 Verification Agent - Verifies customer identity and documents
 """
 from agent_framework import ChatAgent
-from agents.utils import create_azure_chat_client, load_prompt
+from agents.utils import create_azure_chat_client, get_or_create_agent, load_prompt
 from maf_tools import get_maf_tools_for_agent
 
 
@@ -14,13 +14,20 @@ class VerificationAgent:
     Tools: list_customer_documents, get_document_url
     """
     
+    TOOLS = (
+        "list_customer_documents",
+        "get_document_url",
+    )
+    
     @staticmethod
     async def create() -> ChatAgent:
+        """Create the Verification agent, built once per process and reused."""
+        return await get_or_create_agent("verification", VerificationAgent._build)
+    
+    @staticmethod
+    async def _build() -> ChatAgent:
         """Create the Verification agent with MCP tools."""
-        tools = await get_maf_tools_for_agent([
-            "list_customer_documents",
-            "get_document_url",
-        ])
+        tools = await get_maf_tools_for_agent(list(VerificationAgent.TOOLS))
         
         chat_client = create_azure_chat_client()
         instructions = load_prompt("verification")
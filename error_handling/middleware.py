@@ -3,48 +3,117 @@ Error handling middleware for FastAPI applications.
 
 This module provides middleware to catch and process exceptions in a consistent way.
 """
+import json
 import logging
-import uuid
-from typing import Callable, Awaitable
+import secrets
 from fastapi import Request, Response, status
-from fastapi.responses import JSONResponse
-from opentelemetry import trace
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request as StarletteRequest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ._core import ErrorCode, ErrorResponse, KYCError, log_error
+from .tracing import current_trace_hex
 
 logger = logging.getLogger("kyc.error_handling")
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """Middleware for handling exceptions and formatting error responses."""
+
+def new_request_id() -> str:
+    """Generate a request ID: 32 random hex chars, ~4x cheaper than str(uuid.uuid4())."""
+    return secrets.token_hex(16)
+
+
+# Pre-encoded header name; ASGI servers deliver header names lowercased
+XRID_HEADER = b"x-request-id"
+
+
+def request_id_from_scope(scope: Scope) -> str:
+    """Return the incoming X-Request-ID, or a new ID, scanning the raw ASGI headers."""
+    for key, value in scope["headers"]:
+        if key == XRID_HEADER:
+            if value:
+                return value.decode("latin-1")
+            break
+    return new_request_id()
+
+
+def _error_json_response(error_response, status_code: int, headers: dict) -> Response:
+    """Render an ErrorResponse in one pass with Pydantic's serializer (no dict round-trip)."""
+    return Response(
+        content=error_response.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+# 404 bodies are {"detail": message}; only the message is encoded per response
+_404_PREFIX = b'{"detail":'
+_404_SUFFIX = b"}"
+
+
+def _not_found_body(message: str) -> bytes:
+    """Encode the 404 body byte-for-byte as JSONResponse would."""
+    if orjson is not None:
+        encoded = orjson.dumps(message)
+    else:
+        encoded = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _404_PREFIX + encoded + _404_SUFFIX
+
+
+class ErrorHandlingMiddleware:
+    """Middleware for handling exceptions and formatting error responses.
+
+    Written as a plain ASGI app rather than a ``BaseHTTPMiddleware`` so requests
+    are not proxied through an extra task and memory streams.
+    """
     
-    def __init__(self, app, service_name: str = "kyc-orchestrator"):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, service_name: str = "kyc-orchestrator"):
+        self.app = app
         self.service_name = service_name
     
-    async def dispatch(self, request: StarletteRequest, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and handle any exceptions."""
-        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add request ID to request state
-        request.state.request_id = request_id
+        # Reuse the ID of an outer RequestIDMiddleware so state and headers agree
+        state = scope.setdefault("state", {})
+        request_id = state.get("request_id") or request_id_from_scope(scope)
         
         # Get trace ID
-        span = trace.get_current_span()
-        trace_id = format(span.get_span_context().trace_id, "032x") if span and span.get_span_context().is_valid else ""
+        trace_id = current_trace_hex()
+        
+        # Add request ID to request state; exception handlers read the trace ID
+        # from here instead of formatting it again
+        state["request_id"] = request_id
+        state["trace_id_hex"] = trace_id
+        
+        response_started = False
+        
+        async def send_with_ids(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # Add request ID and trace ID to response headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                if trace_id:
+                    headers["X-Trace-ID"] = trace_id
+            await send(message)
         
         try:
             # Process the request
-            response = await call_next(request)
-            
-            # Add request ID and trace ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            if trace_id:
-                response.headers["X-Trace-ID"] = trace_id
-            
-            return response
-            
+            await self.app(scope, receive, send_with_ids)
         except Exception as exc:
-            return await self._handle_exception(exc, request_id, trace_id, request)
+            if response_started:
+                raise
+            response = await self._handle_exception(exc, request_id, trace_id, StarletteRequest(scope))
+            await response(scope, receive, send)
     
     async def _handle_exception(
         self,
@@ -52,11 +121,8 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
         request_id: str,
         trace_id: str,
         request: StarletteRequest
-    ) -> JSONResponse:
+    ) -> Response:
         """Handle an exception and return an appropriate response."""
-        # Import here to avoid circular dependency
-        from error_handling import KYCError, ErrorResponse, log_error
-        
         # Convert to KYCError if not already
         if not isinstance(exc, KYCError):
             exc = KYCError.from_exception(exc)
@@ -80,8 +146,8 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
         )
         
         # Return JSON response
-        return JSONResponse(
-            content=error_response.model_dump(),
+        return _error_json_response(
+            error_response,
             status_code=exc.status_code,
             headers={
                 "X-Request-ID": request_id,
@@ -92,16 +158,15 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
 
 def setup_error_handling(app, service_name: str = "kyc-orchestrator") -> None:
     """Set up error handling middleware for a FastAPI application."""
-    from error_handling import KYCError, ErrorResponse, log_error
-    
     app.add_middleware(ErrorHandlingMiddleware, service_name=service_name)
     
     @app.exception_handler(KYCError)
-    async def kyc_error_handler(request: Request, exc: KYCError) -> JSONResponse:
+    async def kyc_error_handler(request: Request, exc: KYCError) -> Response:
         """Handle KYCError exceptions."""
         request_id = request.headers.get("x-request-id", "")
-        span = trace.get_current_span()
-        trace_id = format(span.get_span_context().trace_id, "032x") if span else ""
+        trace_id = getattr(request.state, "trace_id_hex", None)
+        if trace_id is None:
+            trace_id = current_trace_hex()
         
         log_error(
             exc,
@@ -117,9 +182,10 @@ def setup_error_handling(app, service_name: str = "kyc-orchestrator") -> None:
         
         # Special-case 404 to match FastAPI "detail" format expected by tests
         if exc.status_code == status.HTTP_404_NOT_FOUND:
-            return JSONResponse(
+            return Response(
+                content=_not_found_body(exc.message),
                 status_code=exc.status_code,
-                content={"detail": exc.message},
+                media_type="application/json",
                 headers={
                     "X-Request-ID": request_id,
                     "X-Trace-ID": trace_id,
@@ -127,11 +193,11 @@ def setup_error_handling(app, service_name: str = "kyc-orchestrator") -> None:
                 }
             )
         else:
-            return JSONResponse(
-                status_code=exc.status_code,
-                content=ErrorResponse(
+            return _error_json_response(
+                ErrorResponse(
                     error=exc.to_dict(request_id=request_id, trace_id=trace_id)
-                ).model_dump(),
+                ),
+                status_code=exc.status_code,
                 headers={
                     "X-Request-ID": request_id,
                     "X-Trace-ID": trace_id,
@@ -140,13 +206,12 @@ def setup_error_handling(app, service_name: str = "kyc-orchestrator") -> None:
             )
     
     @app.exception_handler(500)
-    async def internal_error_handler(request: Request, exc: Exception) -> JSONResponse:
+    async def internal_error_handler(request: Request, exc: Exception) -> Response:
         """Handle unexpected exceptions."""
-        from . import KYCError, ErrorCode
-        
-        request_id = request.headers.get("x-request-id", str(uuid.uuid4()))
-        span = trace.get_current_span()
-        trace_id = format(span.get_span_context().trace_id, "032x") if span else ""
+        request_id = request.headers.get("x-request-id") or new_request_id()
+        trace_id = getattr(request.state, "trace_id_hex", None)
+        if trace_id is None:
+            trace_id = current_trace_hex()
         
         # Log the full exception
         logger.error(
@@ -171,11 +236,11 @@ def setup_error_handling(app, service_name: str = "kyc-orchestrator") -> None:
             }
         )
         
-        return JSONResponse(
-            status_code=error.status_code,
-            content=ErrorResponse(
+        return _error_json_response(
+            ErrorResponse(
                 error=error.to_dict(request_id=request_id, trace_id=trace_id)
-            ).model_dump(),
+            ),
+            status_code=error.status_code,
             headers={
                 "X-Request-ID": request_id,
                 "X-Trace-ID": trace_id,
@@ -1,17 +1,107 @@
 """
 OpenTelemetry configuration and utilities for distributed tracing.
 """
+import asyncio
+import logging
 import os
-from typing import Optional, Dict, Any
+from functools import wraps
+from typing import Optional, Dict, Any, List
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanProcessor
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+    SpanProcessor,
+)
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.sdk.resources import Resource, SERVICE_NAME, DEPLOYMENT_ENVIRONMENT
 from opentelemetry.trace.status import Status, StatusCode
 
+logger = logging.getLogger("kyc.error_handling")
+
+_INPUT_TOKENS = 'gen_ai.usage.input_tokens'
+_OUTPUT_TOKENS = 'gen_ai.usage.output_tokens'
+
+# Batch export tuning: larger batches mean fewer OTLP round-trips, the 1s delay
+# bounds how stale exported spans get. The standard OTEL_BSP_* variables override.
+_BSP_MAX_QUEUE_SIZE = 8192
+_BSP_MAX_EXPORT_BATCH_SIZE = 2048
+_BSP_SCHEDULE_DELAY_MILLIS = 1000
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to `default` on bad input."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+    if parsed <= 0:
+        logger.warning("Ignoring invalid %s=%r; using %d", name, value, default)
+        return default
+    return parsed
+
+
+def _batch_processor_options() -> Dict[str, int]:
+    """BatchSpanProcessor settings, with the export batch clamped to the queue size."""
+    max_queue_size = _env_int("OTEL_BSP_MAX_QUEUE_SIZE", _BSP_MAX_QUEUE_SIZE)
+    return {
+        "max_queue_size": max_queue_size,
+        "max_export_batch_size": min(
+            _env_int("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", _BSP_MAX_EXPORT_BATCH_SIZE), max_queue_size
+        ),
+        "schedule_delay_millis": _env_int("OTEL_BSP_SCHEDULE_DELAY", _BSP_SCHEDULE_DELAY_MILLIS),
+    }
+
+class MultiplexingSpanExporter(SpanExporter):
+    """
+    Fan a batch of spans out to several exporters.
+    
+    Lets every exporter share one BatchSpanProcessor (one queue and worker thread)
+    instead of each getting its own. `exporters` may be mutated to toggle exporters
+    at runtime.
+    """
+    
+    def __init__(self, exporters: List[SpanExporter]):
+        self.exporters = exporters
+    
+    def export(self, spans) -> SpanExportResult:
+        # Every exporter gets the batch even if an earlier one fails or raises
+        result = SpanExportResult.SUCCESS
+        for exporter in list(self.exporters):
+            try:
+                if exporter.export(spans) is not SpanExportResult.SUCCESS:
+                    result = SpanExportResult.FAILURE
+            except Exception:
+                logger.exception("Span exporter %r failed", exporter)
+                result = SpanExportResult.FAILURE
+        return result
+    
+    def shutdown(self) -> None:
+        for exporter in list(self.exporters):
+            try:
+                exporter.shutdown()
+            except Exception:
+                logger.exception("Span exporter %r failed to shut down", exporter)
+    
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        flushed = True
+        for exporter in list(self.exporters):
+            try:
+                if not exporter.force_flush(timeout_millis):
+                    flushed = False
+            except Exception:
+                logger.exception("Span exporter %r failed to flush", exporter)
+                flushed = False
+        return flushed
+
+
 def setup_tracing(
     service_name: str = "kyc-orchestrator",
     environment: str = "development",
@@ -40,30 +130,32 @@ def setup_tracing(
     # Configure provider
     provider = TracerProvider(resource=resource)
 
+    # Resolved once here rather than per span; a module-level import would be circular
+    try:
+        from telemetry_collector import register_trace_usage
+    except Exception:
+        register_trace_usage = None
+
     # Span processor to capture gen_ai usage and stash by trace_id
     class UsageCaptureSpanProcessor(SpanProcessor):
         def on_start(self, span, parent_context=None):
             pass
         def on_end(self, span):
+            attrs = span.attributes
+            # Only act if gen_ai usage attributes exist (most spans stop here)
+            if not attrs or (_INPUT_TOKENS not in attrs and _OUTPUT_TOKENS not in attrs):
+                return
+            if register_trace_usage is None:
+                return
             try:
-                attrs = getattr(span, 'attributes', None)
-                if not attrs:
-                    return
-                # Only act if gen_ai usage attributes exist
-                it = attrs.get('gen_ai.usage.input_tokens')
-                ot = attrs.get('gen_ai.usage.output_tokens')
-                if it is None and ot is None:
-                    return
                 # Register usage by trace_id
                 span_context = span.get_span_context()
-                trace_hex = format(span_context.trace_id, '032x') if span_context and span_context.is_valid else None
-                if trace_hex:
-                    try:
-                        # Lazy import to avoid cycles
-                        from telemetry_collector import register_trace_usage
-                        register_trace_usage(trace_hex, it, ot)
-                    except Exception:
-                        pass
+                if span_context and span_context.is_valid:
+                    register_trace_usage(
+                        format(span_context.trace_id, '032x'),
+                        attrs.get(_INPUT_TOKENS),
+                        attrs.get(_OUTPUT_TOKENS),
+                    )
             except Exception:
                 pass
         def shutdown(self):
@@ -78,15 +170,18 @@ def setup_tracing(
     is_test = 'pytest' in sys.modules or 'unittest' in sys.modules
     # Respect ENABLE_CONSOLE_EXPORTERS env var to suppress noisy JSON span dumps
     enable_console = os.getenv("ENABLE_CONSOLE_EXPORTERS", "false").lower() == "true"
+    exporters: List[SpanExporter] = []
     if environment == "development" and not is_test and enable_console:
-        console_exporter = ConsoleSpanExporter()
-        provider.add_span_processor(BatchSpanProcessor(console_exporter))
+        exporters.append(ConsoleSpanExporter())
     
     # Add OTLP exporter if configured
     if otlp_endpoint:
-        otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
+        exporters.append(OTLPSpanExporter(endpoint=otlp_endpoint))
+    
+    # One batch processor feeds every exporter; none at all when nothing is exported
+    if exporters:
         provider.add_span_processor(
-            BatchSpanProcessor(otlp_exporter)
+            BatchSpanProcessor(MultiplexingSpanExporter(exporters), **_batch_processor_options())
         )
     
     # Set the global tracer provider
@@ -107,6 +202,11 @@ def get_tracer(name: str = None) -> trace.Tracer:
     """Get a tracer instance."""
     return trace.get_tracer(name or __name__)
 
+def current_trace_hex() -> str:
+    """Hex trace ID of the current span, or "" when there is no valid span."""
+    span_context = trace.get_current_span().get_span_context()
+    return format(span_context.trace_id, "032x") if span_context.is_valid else ""
+
 def trace_span(
     name: str,
     attributes: Optional[Dict[str, Any]] = None,
@@ -116,48 +216,53 @@ def trace_span(
 ):
     """Decorator for adding tracing to functions."""
     def decorator(func):
-        async def async_wrapper(*args, **inner_kwargs):
-            tracer = get_tracer(func.__module__)
-            with tracer.start_as_current_span(
-                name,
-                kind=kind,
-                attributes=attributes,
-                **kwargs
-            ) as span:
-                try:
-                    return await func(*args, **inner_kwargs)
-                except Exception as e:
-                    if record_exception:
-                        span.record_exception(e)
-                        span.set_status(Status(StatusCode.ERROR, str(e)))
-                    raise
+        tracer = get_tracer(func.__module__)
+        # Only an explicitly disabled provider yields a NoOpTracer; before
+        # setup_tracing() runs this is a ProxyTracer that picks up the real one later
+        if isinstance(tracer, trace.NoOpTracer):
+            return func
         
-        def sync_wrapper(*args, **inner_kwargs):
-            tracer = get_tracer(func.__module__)
-            with tracer.start_as_current_span(
-                name,
-                kind=kind,
-                attributes=attributes,
-                **kwargs
-            ) as span:
-                try:
-                    return func(*args, **inner_kwargs)
-                except Exception as e:
-                    if record_exception:
-                        span.record_exception(e)
-                        span.set_status(Status(StatusCode.ERROR, str(e)))
-                    raise
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **inner_kwargs):
+                with tracer.start_as_current_span(
+                    name,
+                    kind=kind,
+                    attributes=attributes,
+                    **kwargs
+                ) as span:
+                    try:
+                        return await func(*args, **inner_kwargs)
+                    except Exception as e:
+                        if record_exception:
+                            span.record_exception(e)
+                            span.set_status(Status(StatusCode.ERROR, str(e)))
+                        raise
+        else:
+            @wraps(func)
+            def wrapper(*args, **inner_kwargs):
+                with tracer.start_as_current_span(
+                    name,
+                    kind=kind,
+                    attributes=attributes,
+                    **kwargs
+                ) as span:
+                    try:
+                        return func(*args, **inner_kwargs)
+                    except Exception as e:
+                        if record_exception:
+                            span.record_exception(e)
+                            span.set_status(Status(StatusCode.ERROR, str(e)))
+                        raise
         
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+        return wrapper
     
     return decorator
 
-# Add this to ensure the decorator works with both sync and async functions
-import asyncio
-
 __all__ = [
     'setup_tracing',
     'get_tracer',
+    'current_trace_hex',
     'trace_span',
     'instrument_fastapi',
 ]
@@ -1,17 +1,21 @@
 """
 Utility functions for error handling and tracing integration.
 """
-import uuid
 import logging
 import inspect
 from typing import Optional, Dict, Any, Type, TypeVar, Callable, Awaitable, Union
 from functools import wraps
 from fastapi import Request, Depends
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from opentelemetry import trace
 
+from ._core import KYCError
+from .middleware import XRID_HEADER, request_id_from_scope
+
 T = TypeVar('T')
 
+logger = logging.getLogger("kyc.error_handling")
+
 class ErrorHandlingConfig:
     """Configuration for error handling and tracing."""
     
@@ -31,6 +35,38 @@ class ErrorHandlingConfig:
         self.enable_error_handling = enable_error_handling
         self.log_level = log_level
 
+class RequestIDMiddleware:
+    """
+    Tag every HTTP request and response with an X-Request-ID.
+    
+    Plain ASGI middleware: reads the incoming header straight from the scope and
+    adds the response header by wrapping send, without building a Request.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = request_id_from_scope(scope)
+        
+        # Add request ID to request state (the dict behind request.state)
+        scope.setdefault("state", {})["request_id"] = request_id
+        header = (XRID_HEADER, request_id.encode("latin-1"))
+        
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add request ID to response headers, replacing any set further in
+                headers = [h for h in message.get("headers", ()) if h[0] != XRID_HEADER]
+                headers.append(header)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_request_id)
+
 def setup_app(
     app: ASGIApp,
     config: Optional[ErrorHandlingConfig] = None
@@ -69,19 +105,7 @@ def setup_app(
         setup_error_handling(app, service_name=config.service_name)
     
     # Add request ID middleware
-    @app.middleware("http")
-    async def add_request_id(request: Request, call_next):
-        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-        
-        # Add request ID to request state
-        request.state.request_id = request_id
-        
-        # Process the request
-        response = await call_next(request)
-        
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        return response
+    app.add_middleware(RequestIDMiddleware)
     
     return app
 
@@ -101,9 +125,6 @@ def handle_errors(
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Import here to avoid circular dependency
-            from error_handling import KYCError, log_error
-            
             try:
                 return await func(*args, **kwargs)
             except error_class as e:
@@ -120,7 +141,6 @@ def handle_errors(
                 
                 # Log the error with context
                 request_id = getattr(getattr(request, "state", None), "request_id", "")
-                logger = logging.getLogger("kyc.error_handling")
                 
                 logger.log(
                     log_level,
@@ -4,13 +4,49 @@ MAF Tool Wrappers for MCP Tools
 Wraps MCP HTTP client tools so they can be used by Microsoft Agent Framework agents.
 MAF agents accept regular Python functions decorated with @ai_function, not FunctionTool objects.
 """
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Awaitable, Dict, List, Optional, Callable, Set, Tuple
+import httpx
 from agent_framework import ai_function
-from mcp_client import get_mcp_client
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from mcp_client import get_mcp_client, on_client_reset
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger("kyc.maf_tools")
 
+# Raw MCP tool list, fetched once per MCP client; the lock lets concurrent agent builds
+# share a single fetch. asyncio locks belong to one event loop, so it is recreated per loop.
+_MCP_TOOLS: Optional[List[Any]] = None
+_TOOLS_LOCK: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+
+# Wrapped MAF tools keyed by base tool name (server prefix stripped), shared by all agents
+_TOOL_CACHE: Dict[str, Callable] = {}
+
+
+def _base_name(name: str) -> str:
+    """Strip the server namespace, e.g. "postgres__get_customer_by_email" -> "get_customer_by_email"."""
+    return name.rpartition("__")[2]
+
+
+def _dumps(result: Dict[str, Any]) -> str:
+    """Compact JSON for tool results handed back to the LLM (no pretty-printing needed)."""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False)
+
+
+def _wrap_sync(invoke: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Awaitable[Any]]:
+    """Adapt a synchronous tool invoke to the awaitable call used by _execute."""
+    async def call(arguments: Dict[str, Any]) -> Any:
+        return invoke(arguments)
+    return call
+
 
 class MCPToolWrapper:
     """Wrapper to convert MCP tools to MAF-compatible async functions."""
@@ -26,24 +62,26 @@ class MCPToolWrapper:
         self.name = mcp_tool.name
         self.description = mcp_tool.description or ""
         
+        # Resolve how to call the tool once rather than on every execution.
+        # MCP tools have ainvoke for async execution
+        if hasattr(mcp_tool, 'ainvoke'):
+            self._invoke = mcp_tool.ainvoke
+        elif hasattr(mcp_tool, 'invoke'):
+            self._invoke = _wrap_sync(mcp_tool.invoke)
+        else:
+            # Fallback to direct call
+            self._invoke = mcp_tool
+        
     async def _execute(self, **kwargs) -> str:
         """Execute the underlying MCP tool."""
         try:
-            # MCP tools have ainvoke for async execution
-            if hasattr(self.mcp_tool, 'ainvoke'):
-                result = await self.mcp_tool.ainvoke(kwargs)
-            elif hasattr(self.mcp_tool, 'invoke'):
-                result = self.mcp_tool.invoke(kwargs)
-            else:
-                # Fallback to direct call
-                result = await self.mcp_tool(kwargs)
+            result = await self._invoke(kwargs)
             
             # Convert result to string if needed
             if isinstance(result, str):
                 return result
             elif isinstance(result, dict):
-                import json
-                return json.dumps(result, indent=2)
+                return _dumps(result)
             else:
                 return str(result)
                 
@@ -65,51 +103,111 @@ class MCPToolWrapper:
         return ai_function(wrapped_tool)
 
 
-async def get_maf_tools_for_agent(tool_names: Optional[List[str]] = None) -> List[Callable]:
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.1, max=2.0),
+    retry=retry_if_exception_type((ConnectionError, TimeoutError, httpx.TransportError)),
+    reraise=True,
+)
+async def _fetch_mcp_tools(mcp_client) -> List:
+    """Fetch the MCP tool list, retrying transient connection failures with backoff."""
+    return await mcp_client.get_tools()
+
+
+def _tools_lock() -> asyncio.Lock:
+    """Return the tool-fetch lock for the running event loop."""
+    global _TOOLS_LOCK
+    loop = asyncio.get_running_loop()
+    if _TOOLS_LOCK is None or _TOOLS_LOCK[0] is not loop:
+        _TOOLS_LOCK = (loop, asyncio.Lock())
+    return _TOOLS_LOCK[1]
+
+
+async def _get_mcp_tools(mcp_client) -> List[Any]:
+    """Return the MCP tool list, fetching it only on first use (or after invalidation)."""
+    global _MCP_TOOLS
+    if _MCP_TOOLS is None:
+        async with _tools_lock():
+            if _MCP_TOOLS is None:
+                # An empty list is not cached so a later call can retry
+                _MCP_TOOLS = await _fetch_mcp_tools(mcp_client) or None
+    return _MCP_TOOLS or []
+
+
+@on_client_reset
+def invalidate_tools_cache() -> None:
     """
-    Get MAF-compatible tools from MCP client.
+    Drop the cached MCP tool list and wrappers so the next lookup refetches (tests, reloads).
+    
+    Also runs whenever the global MCP client is replaced or closed.
+    """
+    global _MCP_TOOLS
+    _MCP_TOOLS = None
+    _TOOL_CACHE.clear()
+
+
+async def prefetch_tools(names: Optional[Set[str]] = None) -> Dict[str, Callable]:
+    """
+    Fetch MCP tools in a single call and memoize their MAF wrappers in _TOOL_CACHE.
     
     Args:
-        tool_names: Optional list of tool names to filter. If None, returns all tools.
+        names: Tool names (plain or server-prefixed) to load. If None, loads all tools.
         
     Returns:
-        List of @ai_function decorated callables
+        Dict of base tool name -> @ai_function decorated callable for the requested tools
     """
+    needed = {_base_name(name) for name in names} if names is not None else None
     try:
         mcp_client = get_mcp_client()
         if not mcp_client:
             logger.warning("MCP client not available, returning empty tool list")
-            return []
+            return {}
         
-        # Get all MCP tools from MCP client
-        mcp_tools = await mcp_client.get_tools()
-        
-        # Filter if tool_names provided
-        if tool_names:
-            needed = set(tool_names)
-            filtered_tools = []
-            for tool in mcp_tools:
-                name = tool.name
-                # Handle namespaced names like "postgres__get_customer_by_email"
-                base_name = name.split("__")[-1] if "__" in name else name
-                if name in needed or base_name in needed:
-                    filtered_tools.append(tool)
-            mcp_tools = filtered_tools
-        
-        # Wrap each tool
-        wrapped_maf_tools = []
-        for mcp_tool in mcp_tools:
+        # One cached tool list covers the union of every requested name
+        for mcp_tool in await _get_mcp_tools(mcp_client):
+            base_name = _base_name(mcp_tool.name)
+            if base_name in _TOOL_CACHE or (needed is not None and base_name not in needed):
+                continue
             wrapper = MCPToolWrapper(mcp_tool)
-            maf_tool = wrapper.to_ai_function()
-            wrapped_maf_tools.append(maf_tool)
+            _TOOL_CACHE[base_name] = wrapper.to_ai_function()
             logger.debug(f"Wrapped MCP tool: {wrapper.name}")
         
-        logger.info(f"Loaded {len(wrapped_maf_tools)} MAF tools from MCP client")
-        return wrapped_maf_tools
-        
     except Exception as e:
         logger.error(f"Error loading MAF tools: {e}", exc_info=True)
-        return []
+        return {}
+    
+    if needed is None:
+        return dict(_TOOL_CACHE)
+    missing = needed - _TOOL_CACHE.keys()
+    if missing:
+        logger.warning(f"MCP tools not found: {sorted(missing)}")
+    return {name: _TOOL_CACHE[name] for name in needed if name in _TOOL_CACHE}
+
+
+async def get_maf_tools_for_agent(tool_names: Optional[List[str]] = None) -> List[Callable]:
+    """
+    Get MAF-compatible tools from MCP client.
+    
+    Tools already loaded by prefetch_tools() are served from the cache; only
+    missing names trigger an MCP fetch.
+    
+    Args:
+        tool_names: Optional list of tool names to filter. If None, returns all tools.
+        
+    Returns:
+        List of @ai_function decorated callables
+    """
+    if not tool_names:
+        tools = list((await prefetch_tools()).values())
+    else:
+        needed = list(dict.fromkeys(_base_name(name) for name in tool_names))
+        missing = set(needed) - _TOOL_CACHE.keys()
+        if missing:
+            await prefetch_tools(missing)
+        tools = [_TOOL_CACHE[name] for name in needed if name in _TOOL_CACHE]
+    
+    logger.info(f"Loaded {len(tools)} MAF tools from MCP client")
+    return tools
 
 
 async def get_tools_by_category(category: str) -> List[Callable]:
@@ -127,19 +225,21 @@ async def get_tools_by_category(category: str) -> List[Callable]:
         if not mcp_client:
             return []
         
-        all_tools = await mcp_client.get_tools()
+        all_tools = await _get_mcp_tools(mcp_client)
         
         # Filter by category prefix (e.g., "postgres__")
-        category_tools = [
-            tool for tool in all_tools 
-            if tool.name.startswith(f"{category}__")
-        ]
+        prefix = f"{category}__"
         
-        # Wrap tools
+        # Wrap tools, reusing wrappers already built for agents
         wrapped_tools = []
-        for mcp_tool in category_tools:
-            wrapper = MCPToolWrapper(mcp_tool)
-            wrapped_tools.append(wrapper.to_ai_function())
+        for mcp_tool in all_tools:
+            if not mcp_tool.name.startswith(prefix):
+                continue
+            base_name = _base_name(mcp_tool.name)
+            tool = _TOOL_CACHE.get(base_name)
+            if tool is None:
+                tool = _TOOL_CACHE[base_name] = MCPToolWrapper(mcp_tool).to_ai_function()
+            wrapped_tools.append(tool)
         
         logger.info(f"Loaded {len(wrapped_tools)} tools for category '{category}'")
         return wrapped_tools
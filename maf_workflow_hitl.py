@@ -26,7 +26,7 @@ from agent_framework import (
     response_handler,
 )
 
-from agents import AGENT_FACTORIES, WORKFLOW_STEPS
+from agents import WORKFLOW_STEPS, build_all_agents
 
 logger = logging.getLogger("kyc.maf_workflow")
 
@@ -41,6 +41,35 @@ def get_telemetry_collector():
         return None
 
 
+# Token count field names across usage shapes (OpenAI, Responses API, Agent Framework)
+_PROMPT_TOKEN_FIELDS = ("prompt_tokens", "input_tokens", "input_token_count")
+_COMPLETION_TOKEN_FIELDS = ("completion_tokens", "output_tokens", "output_token_count")
+
+
+def _lookup(obj: Any, key: str) -> Any:
+    """Read `key` from a dict or an object attribute; None if obj is None or key is missing."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def _first_field(obj: Any, names: tuple) -> Any:
+    """Return the first of `names` present (not None) on a dict or object."""
+    if isinstance(obj, dict):
+        for name in names:
+            value = obj.get(name)
+            if value is not None:
+                return value
+    else:
+        for name in names:
+            value = getattr(obj, name, None)
+            if value is not None:
+                return value
+    return None
+
+
 @dataclass
 class DataRequest:
     """Request sent to user when agent needs more information."""
@@ -64,6 +93,9 @@ class KYCTurnManager(Executor):
         super().__init__(id=id)
         self.current_step_index = 0
         self.customer_data: Dict[str, Any] = {}
+        # Serialized customer_data for prompts, rebuilt only after customer_data changes
+        self._customer_data_json: Optional[str] = None
+        self._customer_data_dirty = True
         self.session_id = session_id
         self.agent_start_times: Dict[str, float] = {}  # Track agent invocation timing
         
@@ -114,53 +146,31 @@ class KYCTurnManager(Executor):
             del self.agent_start_times[current_step]
         
         # Extract token usage from agent response if available (robust across shapes)
-        def _safe_get(obj, path: list[str]):
-            cur = obj
-            for key in path:
-                if cur is None:
-                    return None
-                # support attr and dict
-                if isinstance(cur, dict):
-                    cur = cur.get(key)
-                else:
-                    cur = getattr(cur, key, None)
-            return cur
-
         tokens = None
         prompt_tokens = None
         completion_tokens = None
 
         try:
-            # Known locations for usage
-            candidates = [
-                _safe_get(result, ["agent_run_response", "usage"]),
-                _safe_get(result, ["agent_run_response", "model_response", "usage"]),
-                _safe_get(result, ["usage"]),
-                _safe_get(result, ["agent_run_response", "additional_metadata", "usage"]),
-                _safe_get(result, ["agent_run_response", "raw_response", "usage"]),
-            ]
-
-            usage = next((u for u in candidates if u), None)
+            # Known locations for usage, most common first; later ones are only probed on a miss
+            run_response = result.agent_run_response
+            usage = (
+                _lookup(run_response, "usage")
+                or _lookup(_lookup(run_response, "model_response"), "usage")
+                or _lookup(result, "usage")
+                or _lookup(_lookup(run_response, "additional_metadata"), "usage")
+                or _lookup(_lookup(run_response, "raw_response"), "usage")
+            )
 
             # If usage looks like JSON string, try parse
             if isinstance(usage, str):
                 try:
-                    import json as _json
-                    usage = _json.loads(usage)
+                    usage = json.loads(usage)
                 except Exception:
                     pass
 
             if usage:
-                # handle both attribute and dict
-                def _val(u, *names):
-                    for n in names:
-                        v = (u.get(n) if isinstance(u, dict) else getattr(u, n, None))
-                        if v is not None:
-                            return v
-                    return None
-
-                prompt_tokens = _val(usage, "prompt_tokens", "input_tokens", "input_token_count")
-                completion_tokens = _val(usage, "completion_tokens", "output_tokens", "output_token_count")
+                prompt_tokens = _first_field(usage, _PROMPT_TOKEN_FIELDS)
+                completion_tokens = _first_field(usage, _COMPLETION_TOKEN_FIELDS)
                 if (prompt_tokens is not None) or (completion_tokens is not None):
                     pt = int(prompt_tokens or 0)
                     ct = int(completion_tokens or 0)
@@ -189,49 +199,49 @@ class KYCTurnManager(Executor):
                     metadata={"response_length": len(agent_text)}
                 )
         
-        # Try to parse as JSON decision
-        try:
-            decision = json.loads(agent_text)
+        # Try to parse as JSON decision; only a JSON object can be one, so plain-text
+        # replies (questions for the user) skip the parser entirely
+        decision = None
+        if agent_text.lstrip()[:1] == "{":
+            try:
+                decision = json.loads(agent_text)
+            except json.JSONDecodeError:
+                pass
+        
+        # Check if it's a decision (has "decision" field) or a question
+        if isinstance(decision, dict) and decision.get("decision") in ("PASS", "REVIEW", "FAIL"):
+            # Agent made a decision - update customer data
+            if "data_collected" in decision:
+                self.customer_data.update(decision["data_collected"])
+                self._customer_data_dirty = True
+                # Emit customer data update event for API to capture
+                await ctx.yield_output(json.dumps({
+                    "type": "customer_data_update",
+                    "data": self.customer_data,
+                    "step": current_step
+                }))
             
-            # Check if it's a decision (has "decision" field) or a question
-            if "decision" in decision and decision["decision"] in ["PASS", "REVIEW", "FAIL"]:
-                # Agent made a decision - update customer data
-                if "data_collected" in decision:
-                    self.customer_data.update(decision["data_collected"])
-                    # Emit customer data update event for API to capture
-                    await ctx.yield_output(json.dumps({
-                        "type": "customer_data_update",
-                        "data": self.customer_data,
-                        "step": current_step
-                    }))
-                
-                if decision["decision"] == "PASS":
-                    # Move to next step
-                    logger.info(f"Step {current_step} passed. Customer data: {self.customer_data}")
-                    await self._advance_to_next_step(ctx, decision.get("notes", "Step completed"))
-                elif decision["decision"] == "FAIL":
-                    # Workflow failed
-                    await ctx.yield_output(json.dumps({
-                        "status": "failed",
-                        "step": current_step,
-                        "reason": decision.get("reason", "Step failed"),
-                        "notes": decision.get("notes", "")
-                    }))
-                else:  # REVIEW
-                    # Need human input
-                    prompt = decision.get("user_message", "Additional information needed")
-                    await ctx.request_info(
-                        request_data=DataRequest(prompt=prompt, step=current_step),
-                        response_type=str
-                    )
-            else:
-                # Not a decision JSON - treat as question for user
+            if decision["decision"] == "PASS":
+                # Move to next step
+                logger.info(f"Step {current_step} passed. Customer data: {self.customer_data}")
+                await self._advance_to_next_step(ctx, decision.get("notes", "Step completed"))
+            elif decision["decision"] == "FAIL":
+                # Workflow failed
+                await ctx.yield_output(json.dumps({
+                    "status": "failed",
+                    "step": current_step,
+                    "reason": decision.get("reason", "Step failed"),
+                    "notes": decision.get("notes", "")
+                }))
+            else:  # REVIEW
+                # Need human input
+                prompt = decision.get("user_message", "Additional information needed")
                 await ctx.request_info(
-                    request_data=DataRequest(prompt=agent_text, step=current_step),
+                    request_data=DataRequest(prompt=prompt, step=current_step),
                     response_type=str
                 )
-        except json.JSONDecodeError:
-            # Plain text response - likely a question for the user
+        else:
+            # Plain text or non-decision JSON - likely a question for the user
             await ctx.request_info(
                 request_data=DataRequest(prompt=agent_text, step=current_step),
                 response_type=str
@@ -292,11 +302,20 @@ class KYCTurnManager(Executor):
                 target_id=next_step
             )
     
+    def _customer_data_block(self) -> str:
+        """Compact JSON of customer_data, re-serialized only when it has changed."""
+        if not self.customer_data:
+            return "No customer data yet"
+        if self._customer_data_dirty:
+            self._customer_data_json = json.dumps(self.customer_data, separators=(",", ":"))
+            self._customer_data_dirty = False
+        return self._customer_data_json
+    
     def _build_agent_prompt(self, user_message: str, step: str) -> str:
         """Build context-aware prompt for agent."""
         return f"""
 Customer Information:
-{json.dumps(self.customer_data, indent=2) if self.customer_data else "No customer data yet"}
+{self._customer_data_block()}
 
 Current Stage: {step}
 Progress: Step {self.current_step_index + 1} of {len(WORKFLOW_STEPS)}
@@ -325,12 +344,8 @@ async def initialize_workflow(session_id: str = "default"):
     
     # Pre-create all agents (since factories are now async)
     logger.info("Pre-creating agents with tool loading...")
-    agents = {}
-    for step_name, agent_factory in AGENT_FACTORIES.items():
-        logger.info(f"Creating {step_name} agent...")
-        agent = await agent_factory()
-        agents[step_name] = agent
-        
+    agents = await build_all_agents()
+    for step_name, agent in agents.items():
         # Register with a simple lambda that returns the pre-created agent
         builder = builder.register_agent(lambda a=agent: a, name=step_name)
     
@@ -12,13 +12,50 @@ import asyncio
 import logging
 import httpx
 from datetime import timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from aiobreaker import CircuitBreaker, CircuitBreakerError
 from error_handling import get_tracer
 
 logger = logging.getLogger("kyc.mcp_client")
 
+# Normalize tool names with server prefixes so tests and agents can target specific servers
+# This ensures consistent naming across the system (e.g., "get_customer_by_email" becomes "postgres__get_customer_by_email")
+_SERVER_TOOL_INDEX: Dict[str, set] = {
+    "postgres": {
+        "get_customer_by_email",
+        "get_customer_history",
+        "get_previous_kyc_sessions",
+        "save_kyc_session_state",
+        "load_kyc_session_state",
+        "delete_kyc_session",
+    },
+    "blob": {
+        "list_customer_documents",
+        "get_document_url",
+        "upload_document",
+        "get_document_metadata",
+        "delete_document",
+    },
+    "email": {
+        "send_kyc_approved_email",
+        "send_kyc_pending_email",
+        "send_kyc_rejected_email",
+    },
+    "rag": {
+        "search_policies",
+        "get_policy_requirements",
+        "check_compliance",
+        "list_policy_categories",
+        "delete_policy_document",
+    },
+}
+
+# Inverse of _SERVER_TOOL_INDEX: base tool name -> owning server, for one-probe lookups
+_TOOL_SERVER: Dict[str, str] = {
+    tool_name: server for server, names in _SERVER_TOOL_INDEX.items() for tool_name in names
+}
+
 
 class KYCMCPClient:
     """
@@ -99,51 +136,16 @@ class KYCMCPClient:
         # Load all tools from all connected servers
         raw_tools = await self._client.get_tools()
         
-        # Normalize tool names with server prefixes so tests and agents can target specific servers
-        # This ensures consistent naming across the system (e.g., "get_customer_by_email" becomes "postgres__get_customer_by_email")
-        server_tool_index = {
-            "postgres": {
-                "get_customer_by_email",
-                "get_customer_history",
-                "get_previous_kyc_sessions",
-                "save_kyc_session_state",
-                "load_kyc_session_state",
-                "delete_kyc_session",
-            },
-            "blob": {
-                "list_customer_documents",
-                "get_document_url",
-                "upload_document",
-                "get_document_metadata",
-                "delete_document",
-            },
-            "email": {
-                "send_kyc_approved_email",
-                "send_kyc_pending_email",
-                "send_kyc_rejected_email",
-            },
-            "rag": {
-                "search_policies",
-                "get_policy_requirements",
-                "check_compliance",
-                "list_policy_categories",
-                "delete_policy_document",
-            },
-        }
-        
         # Prefix each tool with its server name for clarity and consistency
         prefixed_tools = []
         for tool in raw_tools:
             name = getattr(tool, "name", "")
             # Extract base name (remove any existing prefix)
-            base = name.split("__")[-1] if "__" in name else name
+            sep = name.rfind("__")
+            base = name[sep + 2:] if sep >= 0 else name
             
             # Find which server this tool belongs to by matching base name
-            server_match = None
-            for server, names in server_tool_index.items():
-                if base in names:
-                    server_match = server
-                    break
+            server_match = _TOOL_SERVER.get(base)
             
             # Add server prefix if not already present
             if server_match and not name.startswith(server_match + "__"):
@@ -339,6 +341,9 @@ class KYCMCPClient:
             self._http_client = None
         
         self._connected = False
+        
+        if self is _mcp_client:
+            _notify_client_reset()
 
     def is_connected(self) -> bool:
         """
@@ -353,6 +358,22 @@ class KYCMCPClient:
 # Global client instance (initialized at app startup)
 _mcp_client: Optional[KYCMCPClient] = None
 
+# Callbacks run when the global client is replaced or closed, so caches holding
+# tools bound to the old client (maf_tools, agents) can drop them
+_client_reset_callbacks: List[Callable[[], None]] = []
+
+
+def on_client_reset(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register `callback` to run whenever the global MCP client is replaced or closed."""
+    if callback not in _client_reset_callbacks:
+        _client_reset_callbacks.append(callback)
+    return callback
+
+
+def _notify_client_reset() -> None:
+    for callback in list(_client_reset_callbacks):
+        callback()
+
 
 def initialize_mcp_client(
     postgres_url: str = "http://127.0.0.1:8001/mcp",
@@ -382,6 +403,7 @@ def initialize_mcp_client(
     """
     global _mcp_client
     _mcp_client = KYCMCPClient(postgres_url, blob_url, email_url, rag_url)
+    _notify_client_reset()
     return _mcp_client
 
 
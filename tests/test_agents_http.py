@@ -4,6 +4,7 @@ Unit tests for MAF KYC agents.
 Tests agents using Microsoft Agent Framework with MCP tool integration.
 """
 
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 import json
@@ -181,5 +182,89 @@ class TestMAFToolIntegration:
             assert isinstance(tools, list)
 
 
+
+class TestAgentCache:
+    """Tests for per-process agent caching in agents.utils."""
+    
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        from agents.utils import clear_agent_cache
+        clear_agent_cache()
+        yield
+        clear_agent_cache()
+    
+    @staticmethod
+    def _mock_chat_client():
+        mock_chat_client = MagicMock()
+        mock_chat_client.create_agent = MagicMock(
+            side_effect=lambda **kwargs: MagicMock(chat_options=MagicMock(tools=list(kwargs["tools"])))
+        )
+        return mock_chat_client
+    
+    @pytest.mark.asyncio
+    async def test_second_create_returns_cached_agent(self):
+        """An agent built with tools is reused by later create() calls."""
+        from agents.intake_agent import IntakeAgent
+        
+        mock_chat_client = self._mock_chat_client()
+        with patch('agents.intake_agent.create_azure_chat_client', return_value=mock_chat_client), \
+             patch('agents.intake_agent.get_maf_tools_for_agent', AsyncMock(return_value=[MagicMock()])):
+            first = await IntakeAgent.create()
+            second = await IntakeAgent.create()
+        
+        assert first is second
+        mock_chat_client.create_agent.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_agent_without_tools_is_not_cached(self):
+        """An agent built while MCP tools are unavailable is rebuilt on the next call."""
+        from agents.intake_agent import IntakeAgent
+        
+        mock_chat_client = self._mock_chat_client()
+        with patch('agents.intake_agent.create_azure_chat_client', return_value=mock_chat_client), \
+             patch('agents.intake_agent.get_maf_tools_for_agent', AsyncMock(return_value=[])):
+            first = await IntakeAgent.create()
+            second = await IntakeAgent.create()
+        
+        assert first is not second
+        assert mock_chat_client.create_agent.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_new_mcp_client_clears_cached_agents(self):
+        """Replacing the global MCP client drops agents bound to the old client's tools."""
+        from agents.intake_agent import IntakeAgent
+        from mcp_client import initialize_mcp_client
+        
+        mock_chat_client = self._mock_chat_client()
+        with patch('agents.intake_agent.create_azure_chat_client', return_value=mock_chat_client), \
+             patch('agents.intake_agent.get_maf_tools_for_agent', AsyncMock(return_value=[MagicMock()])), \
+             patch('mcp_client._mcp_client', None):
+            first = await IntakeAgent.create()
+            initialize_mcp_client()
+            second = await IntakeAgent.create()
+        
+        assert first is not second
+        assert mock_chat_client.create_agent.call_count == 2
+    
+    def test_uncached_builds_usable_across_event_loops(self):
+        """Build locks are per event loop, so contended rebuilds work in separate asyncio.run() calls."""
+        from agents.utils import get_or_create_agent
+        
+        async def factory():
+            await asyncio.sleep(0.01)
+            return MagicMock(chat_options=MagicMock(tools=[]))
+        
+        async def build_twice():
+            # The second build waits on (and so binds) the lock held by the first
+            return await asyncio.gather(
+                get_or_create_agent("intake", factory), get_or_create_agent("intake", factory)
+            )
+        
+        asyncio.run(build_twice())
+        first, second = asyncio.run(build_twice())
+        
+        assert first is not second
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+"""
+Tests for the MCP tool list cache in maf_tools.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import maf_tools
+from maf_tools import get_maf_tools_for_agent, get_tools_by_category, invalidate_tools_cache
+
+
+def _mock_tool(name: str) -> MagicMock:
+    tool = MagicMock()
+    tool.name = name
+    tool.description = f"{name} tool"
+    return tool
+
+
+@pytest.fixture(autouse=True)
+def clear_tools_cache():
+    invalidate_tools_cache()
+    yield
+    invalidate_tools_cache()
+
+
+@pytest.fixture
+def mock_mcp_client():
+    client = MagicMock()
+    client.get_tools = AsyncMock(return_value=[
+        _mock_tool("postgres__get_customer_by_email"),
+        _mock_tool("rag__search_policies"),
+    ])
+    with patch("maf_tools.get_mcp_client", return_value=client):
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_tool_list_fetched_once(mock_mcp_client):
+    """Agents and category lookups share one MCP fetch and the same wrappers."""
+    first = await get_maf_tools_for_agent(["get_customer_by_email"])
+    second = await get_maf_tools_for_agent(["search_policies"])
+    category = await get_tools_by_category("postgres")
+
+    assert len(first) == 1 and len(second) == 1
+    assert category == first
+    mock_mcp_client.get_tools.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_fetch(mock_mcp_client):
+    """Concurrent agent builds wait on the same fetch instead of each hitting MCP."""
+    results = await asyncio.gather(*(get_maf_tools_for_agent(["search_policies"]) for _ in range(5)))
+
+    assert all(len(tools) == 1 for tools in results)
+    mock_mcp_client.get_tools.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_empty_tool_list_not_cached(mock_mcp_client):
+    """An empty result is retried on the next lookup rather than cached."""
+    mock_mcp_client.get_tools.return_value = []
+    assert await get_maf_tools_for_agent(["search_policies"]) == []
+
+    mock_mcp_client.get_tools.return_value = [_mock_tool("rag__search_policies")]
+    assert len(await get_maf_tools_for_agent(["search_policies"])) == 1
+    assert mock_mcp_client.get_tools.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tools_cache_refetches(mock_mcp_client):
+    """invalidate_tools_cache() drops the tool list and wrappers."""
+    await get_maf_tools_for_agent(["search_policies"])
+    invalidate_tools_cache()
+    await get_maf_tools_for_agent(["search_policies"])
+
+    assert mock_mcp_client.get_tools.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_new_mcp_client_invalidates_cache(mock_mcp_client):
+    """Replacing the global MCP client drops tools bound to the old one."""
+    from mcp_client import initialize_mcp_client
+
+    await get_maf_tools_for_agent(["search_policies"])
+    with patch("mcp_client._mcp_client", None):
+        initialize_mcp_client()
+
+    assert maf_tools._MCP_TOOLS is None
+    assert maf_tools._TOOL_CACHE == {}
+
+
+def test_cache_usable_across_event_loops(mock_mcp_client):
+    """The fetch lock is per event loop, so separate asyncio.run() calls both work."""
+    async def slow_get_tools():
+        await asyncio.sleep(0.01)
+        return [_mock_tool("rag__search_policies")]
+
+    mock_mcp_client.get_tools.side_effect = slow_get_tools
+
+    async def build_agents():
+        # Concurrent lookups make the later ones wait on (and so bind) the lock
+        return await asyncio.gather(*(get_maf_tools_for_agent(["search_policies"]) for _ in range(3)))
+
+    asyncio.run(build_agents())
+    invalidate_tools_cache()
+    results = asyncio.run(build_agents())
+
+    assert all(len(tools) == 1 for tools in results)
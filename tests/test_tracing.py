@@ -0,0 +1,94 @@
+"""Tests for the span export fan-out in error_handling.tracing."""
+from unittest.mock import Mock
+
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExportResult
+
+from error_handling.tracing import MultiplexingSpanExporter, _batch_processor_options
+
+
+def _exporter(result=SpanExportResult.SUCCESS, flushed=True):
+    exporter = Mock()
+    exporter.export.return_value = result
+    exporter.force_flush.return_value = flushed
+    return exporter
+
+
+def _raising_exporter():
+    exporter = Mock()
+    exporter.export.side_effect = RuntimeError("console closed")
+    exporter.shutdown.side_effect = RuntimeError("console closed")
+    exporter.force_flush.side_effect = RuntimeError("console closed")
+    return exporter
+
+
+def test_export_succeeds_when_all_exporters_succeed():
+    exporters = [_exporter(), _exporter()]
+    assert MultiplexingSpanExporter(exporters).export(["span"]) is SpanExportResult.SUCCESS
+    for exporter in exporters:
+        exporter.export.assert_called_once_with(["span"])
+
+
+def test_raising_exporter_does_not_skip_the_others():
+    """A failing exporter marks the batch failed but later exporters still receive it."""
+    healthy = _exporter()
+    multiplexer = MultiplexingSpanExporter([_raising_exporter(), healthy])
+
+    assert multiplexer.export(["span"]) is SpanExportResult.FAILURE
+    healthy.export.assert_called_once_with(["span"])
+
+
+def test_failed_export_result_is_reported():
+    healthy = _exporter()
+    multiplexer = MultiplexingSpanExporter([_exporter(SpanExportResult.FAILURE), healthy])
+
+    assert multiplexer.export(["span"]) is SpanExportResult.FAILURE
+    healthy.export.assert_called_once()
+
+
+def test_shutdown_and_flush_reach_every_exporter():
+    healthy = _exporter()
+    multiplexer = MultiplexingSpanExporter([_raising_exporter(), healthy])
+
+    multiplexer.shutdown()
+    healthy.shutdown.assert_called_once()
+
+    assert multiplexer.force_flush(1000) is False
+    healthy.force_flush.assert_called_once_with(1000)
+
+
+def test_force_flush_reports_unflushed_exporter():
+    healthy = _exporter()
+    multiplexer = MultiplexingSpanExporter([_exporter(flushed=False), healthy])
+
+    assert multiplexer.force_flush() is False
+    healthy.force_flush.assert_called_once()
+
+
+def test_batch_options_default(monkeypatch):
+    for name in ("OTEL_BSP_MAX_QUEUE_SIZE", "OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "OTEL_BSP_SCHEDULE_DELAY"):
+        monkeypatch.delenv(name, raising=False)
+
+    assert _batch_processor_options() == {
+        "max_queue_size": 8192,
+        "max_export_batch_size": 2048,
+        "schedule_delay_millis": 1000,
+    }
+
+
+def test_batch_options_ignore_malformed_env(monkeypatch):
+    monkeypatch.setenv("OTEL_BSP_MAX_QUEUE_SIZE", "lots")
+    monkeypatch.setenv("OTEL_BSP_SCHEDULE_DELAY", "-5")
+
+    options = _batch_processor_options()
+    assert options["max_queue_size"] == 8192
+    assert options["schedule_delay_millis"] == 1000
+
+
+def test_batch_size_clamped_to_queue_size(monkeypatch):
+    """BatchSpanProcessor rejects a batch larger than its queue, so the batch is clamped."""
+    monkeypatch.setenv("OTEL_BSP_MAX_QUEUE_SIZE", "100")
+    monkeypatch.setenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "500")
+
+    options = _batch_processor_options()
+    assert options["max_export_batch_size"] == 100
+    BatchSpanProcessor(Mock(), **options).shutdown()